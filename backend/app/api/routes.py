@@ -1,15 +1,22 @@
 from __future__ import annotations
 
-import asyncio
-import json
+import io
+import os
 import re
-import uuid
+import string
+import tempfile
+import time
+from contextlib import AsyncExitStack
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from secrets import token_hex
+from typing import Any, BinaryIO
 
-from fastapi import APIRouter, BackgroundTasks, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi import APIRouter, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from ..config import settings
 from ..models import (
@@ -21,23 +28,49 @@ from ..models import (
     AnnotationResponse,
     HealthResponse,
     HistoryResponse,
+    ProgressEvent,
     ProgressStep,
 )
 from ..repositories import (
-    create_analysis,
     create_annotation,
-    create_submission,
+    create_submission_and_analysis,
     get_analysis,
     list_history,
+    mark_analysis_failed,
     mistake_exists,
 )
-from ..services.analyzer import process_analysis_job
+from ..services.progress_cache import progress_cache
 from ..services.queue_manager import queue_manager
 
 router = APIRouter(prefix="/api/v1", tags=["v1"])
 
-ALLOWED_IMAGE_MIME = {"image/jpeg", "image/jpg", "image/png", "image/webp"}
+IMAGE_SUFFIX_BY_MIME = {
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+ALLOWED_IMAGE_MIME = frozenset(IMAGE_SUFFIX_BY_MIME)
 USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+# Set-based equivalent of USER_ID_PATTERN used on the request path.
+_USER_ID_LEADING_CHARS = frozenset(string.ascii_letters + string.digits)
+_USER_ID_CHARS = frozenset(string.ascii_letters + string.digits + "._-")
+SSE_WATCHDOG_SECONDS = 30.0
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Objects whose fileno() is a real descriptor sendfile(2) can read from.
+_DISK_FILE_TYPES = (io.BufferedRandom, io.BufferedReader, io.FileIO)
+
+_PROGRESS_QUEUED = (ProgressStep.upload_complete, 20, "이미지 업로드 완료")
+_PROGRESS_DONE = (ProgressStep.completed, 100, "분석 완료")
+_PROGRESS_FAILED = (ProgressStep.failed, 100, "분석 실패")
+
+
+def _is_valid_user_id(user_id: str) -> bool:
+    return (
+        0 < len(user_id) <= 64
+        and user_id[0] in _USER_ID_LEADING_CHARS
+        and _USER_ID_CHARS.issuperset(user_id)
+    )
 
 
 def _resolve_user_id(header_user_id: str | None, query_user_id: str | None = None) -> str:
@@ -47,7 +80,7 @@ def _resolve_user_id(header_user_id: str | None, query_user_id: str | None = Non
     user_id = raw_user_id.strip()
     if not user_id:
         raise HTTPException(status_code=400, detail="X-User-Id header is required.")
-    if not USER_ID_PATTERN.fullmatch(user_id):
+    if not _is_valid_user_id(user_id):
         raise HTTPException(
             status_code=400,
             detail="Invalid user id. Use 1-64 chars: letters, digits, dot, underscore, hyphen.",
@@ -63,51 +96,123 @@ def _validate_upload(upload: UploadFile) -> None:
         )
 
 
-def _save_upload(upload: UploadFile) -> str:
-    suffix = Path(upload.filename or "upload.jpg").suffix.lower() or ".jpg"
-    filename = f"{uuid.uuid4().hex}{suffix}"
-    target_path = Path(settings.storage_path) / filename
-    payload = upload.file.read()
-    if len(payload) > settings.max_upload_bytes:
-        raise HTTPException(status_code=400, detail="File too large.")
-    target_path.parent.mkdir(parents=True, exist_ok=True)
-    _ = target_path.write_bytes(payload)
-    return str(target_path.resolve())
+async def _save_upload(upload: UploadFile) -> str:
+    # _validate_upload has already restricted content_type to IMAGE_SUFFIX_BY_MIME keys.
+    filename = f"{token_hex(16)}{IMAGE_SUFFIX_BY_MIME[upload.content_type]}"
+    target_path = settings.storage_path / filename
+
+    limit = settings.max_upload_bytes
+    out = await run_in_threadpool(_open_upload_target, target_path)
+    try:
+        try:
+            written = await run_in_threadpool(_sendfile_upload, upload, out.fileno(), limit)
+            if written is None:
+                written = 0
+                while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > limit:
+                        break
+                    await run_in_threadpool(out.write, chunk)
+        finally:
+            await run_in_threadpool(out.close)
+        if written > limit:
+            raise HTTPException(status_code=400, detail="File too large.")
+    except BaseException:
+        # The target was created up front; never leave a partial file behind.
+        await run_in_threadpool(target_path.unlink, missing_ok=True)
+        raise
+    return filename
+
+
+def _open_upload_target(target_path: Path) -> BinaryIO:
+    # The storage directory is created once at startup by ensure_paths().
+    fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o644)
+    return os.fdopen(fd, "wb")
+
+
+def _disk_backed_file(source: Any) -> Any | None:
+    """Return the real OS file behind ``source``, or None if it only lives in memory."""
+    if isinstance(source, tempfile.SpooledTemporaryFile):
+        # Calling fileno() on the spool itself would roll an in-memory upload to disk,
+        # so look at what it currently wraps instead.
+        source = getattr(source, "_file", None)
+    if isinstance(source, _DISK_FILE_TYPES):
+        return source
+    return None
+
+
+def _sendfile_upload(upload: UploadFile, out_fd: int, limit: int) -> int | None:
+    """Copy an on-disk upload with sendfile(2); return None to use the chunked path."""
+    if not hasattr(os, "sendfile"):
+        return None
+    source = upload.file
+    disk_file = _disk_backed_file(source)
+    if disk_file is None:
+        return None
+    try:
+        source.flush()
+        in_fd = disk_file.fileno()
+    except (io.UnsupportedOperation, OSError, ValueError):
+        return None
+
+    sent = 0
+    try:
+        while (count := limit + 1 - sent) > 0:
+            copied = os.sendfile(out_fd, in_fd, sent, count)
+            if copied == 0:
+                break
+            sent += copied
+    except OSError:
+        os.ftruncate(out_fd, 0)
+        os.lseek(out_fd, 0, os.SEEK_SET)
+        source.seek(0)
+        return None
+    return sent
 
 
-def _parse_timestamp(value: str | None) -> datetime | None:
+@lru_cache(maxsize=4096)
+def _parse_timestamp_epoch(value: str | None) -> float | None:
     if not value:
         return None
     try:
         parsed = datetime.fromisoformat(value)
-        if parsed.tzinfo is None:
-            return parsed.replace(tzinfo=UTC)
-        return parsed
     except ValueError:
         return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
 
 
 def _progress_for_record(record: dict[str, Any]) -> tuple[ProgressStep, int, str]:
     status = record["status"]
     if status == "queued":
-        return ProgressStep.upload_complete, 20, "이미지 업로드 완료"
+        return _PROGRESS_QUEUED
     if status == "processing":
-        updated_at = _parse_timestamp(record.get("updated_at"))
-        now = datetime.now(UTC)
-        elapsed_seconds = max(0.0, (now - updated_at).total_seconds()) if updated_at else 0.0
+        updated_ts = _parse_timestamp_epoch(record.get("updated_at"))
+        elapsed_seconds = max(0.0, time.time() - updated_ts) if updated_ts is not None else 0.0
         if elapsed_seconds < 3:
             percent = min(58, 35 + int(elapsed_seconds * 8))
             return ProgressStep.ocr_analyzing, percent, "OCR 분석 중"
         percent = min(96, 58 + int((elapsed_seconds - 3) * 4))
         return ProgressStep.ai_grading, percent, "AI 채점 중"
     if status == "done":
-        return ProgressStep.completed, 100, "분석 완료"
-    return ProgressStep.failed, 100, "분석 실패"
+        return _PROGRESS_DONE
+    return _PROGRESS_FAILED
+
+
+def _next_poll_delay(status: str, idle_ticks: int) -> float:
+    if status == "processing":
+        return settings.sse_min_interval
+    # Queued jobs rarely change; back off exponentially until the record moves again.
+    return min(settings.sse_max_interval, settings.sse_min_interval * 2 ** (min(idle_ticks, 16) + 1))
+
+
+def _format_sse(event: ProgressEvent) -> str:
+    return f"data: {event.model_dump_json()}\n\n"
 
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze(
-    background_tasks: BackgroundTasks,
     solution_image: UploadFile | None = File(default=None),
     problem_image: UploadFile | None = File(default=None),
     meta: str = Form(default="{}"),
@@ -122,27 +227,26 @@ async def analyze(
         _validate_upload(problem_image)
 
     try:
-        meta_obj = AnalysisMeta.model_validate(json.loads(meta))
+        meta_obj = AnalysisMeta.model_validate_json(meta)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Invalid meta payload: {exc}") from exc
 
-    solution_path = _save_upload(solution_image)
-    problem_path = _save_upload(problem_image) if problem_image else None
+    solution_filename = await _save_upload(solution_image)
+    problem_filename = await _save_upload(problem_image) if problem_image else None
 
     try:
-        submission_id = create_submission(
+        submission_id, analysis_id = create_submission_and_analysis(
             subject=meta_obj.subject.value,
-            solution_img_path=solution_path,
-            problem_img_path=problem_path,
+            solution_img_path=solution_filename,
+            problem_img_path=problem_filename,
             user_id=user_id,
         )
-        analysis_id = create_analysis(submission_id=submission_id)
     except Exception as exc:
-        for path in (solution_path, problem_path):
-            if not path:
+        for filename in (solution_filename, problem_filename):
+            if not filename:
                 continue
             try:
-                Path(path).unlink(missing_ok=True)
+                (settings.storage_path / filename).unlink(missing_ok=True)
             except Exception:
                 pass
         raise HTTPException(status_code=500, detail=f"Failed to create analysis record: {exc}") from exc
@@ -152,8 +256,8 @@ async def analyze(
         "submission_id": submission_id,
         "subject": meta_obj.subject.value,
         "highlight_mode": meta_obj.highlight_mode.value,
-        "solution_image_path": solution_path,
-        "problem_image_path": problem_path,
+        "solution_image_path": str(settings.storage_path / solution_filename),
+        "problem_image_path": str(settings.storage_path / problem_filename) if problem_filename else None,
         "user_id": user_id,
     }
 
@@ -161,8 +265,9 @@ async def analyze(
         queued = queue_manager.enqueue_analysis(payload)
     except Exception:
         queued = False
-    if not queued:
-        background_tasks.add_task(process_analysis_job, payload)
+    if not queued and not queue_manager.local_jobs.submit(payload):
+        mark_analysis_failed(analysis_id, "queue_full")
+        raise HTTPException(status_code=503, detail="Analysis queue is full. Please retry shortly.")
 
     return AnalyzeResponse(analysis_id=analysis_id, status=AnalyzeStatus.queued)
 
@@ -178,10 +283,8 @@ async def analysis_detail(
         raise HTTPException(status_code=404, detail="Analysis not found.")
 
     progress_step, progress_percent, progress_message = _progress_for_record(record)
-    solution_image_url = f"/uploads/{Path(record['solution_img_path']).name}"
-    problem_image_url = (
-        f"/uploads/{Path(record['problem_img_path']).name}" if record.get("problem_img_path") else None
-    )
+    solution_image_url = f"/uploads/{record['solution_img_path']}"
+    problem_image_url = f"/uploads/{record['problem_img_path']}" if record.get("problem_img_path") else None
 
     return AnalyzeDetailResponse(
         analysis_id=record["analysis_id"],
@@ -208,45 +311,73 @@ async def analysis_events(
     x_user_id: str | None = Header(default=None, alias="X-User-Id"),
 ) -> StreamingResponse:
     resolved_user_id = _resolve_user_id(x_user_id, user_id)
-    initial = get_analysis(analysis_id, user_id=resolved_user_id)
+    subscription_scope = AsyncExitStack()
+    # Subscribe before the one and only initial read so a transition published in between is not lost.
+    subscription = await subscription_scope.enter_async_context(queue_manager.subscribe_progress(analysis_id))
+    try:
+        initial = get_analysis(analysis_id, user_id=resolved_user_id)
+    except BaseException:
+        await subscription_scope.aclose()
+        raise
     if not initial:
+        await subscription_scope.aclose()
         raise HTTPException(status_code=404, detail="Analysis not found.")
 
-    async def event_stream():
-        last_fingerprint: tuple[str, str | None, ProgressStep, int] | None = None
-        while True:
-            record = get_analysis(analysis_id, user_id=resolved_user_id)
-            if not record:
-                break
-
-            progress_step, progress_percent, progress_message = _progress_for_record(record)
-            fingerprint = (record["status"], record.get("updated_at"), progress_step, progress_percent)
-            if fingerprint != last_fingerprint:
-                payload = {
-                    "analysis_id": record["analysis_id"],
-                    "status": record["status"],
-                    "progress_step": progress_step.value,
-                    "progress_percent": progress_percent,
-                    "progress_message": progress_message,
-                    "updated_at": record["updated_at"],
-                }
-                yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
-                last_fingerprint = fingerprint
-
-            if record["status"] in {"done", "failed"}:
-                break
-
-            yield ": ping\n\n"
-            await asyncio.sleep(1.0)
+    async def event_stream(record: dict[str, Any] | None):
+        async with subscription_scope:
+            last_state: tuple[str, str | None] | None = None
+            last_fingerprint: tuple[str, str | None, ProgressStep, int] | None = None
+            idle_ticks = 0
+            last_synced = time.monotonic()
+            while record:
+                state = (record["status"], record.get("updated_at"))
+                emitted = False
+                # Only "processing" progress depends on the clock; other states are fixed per record.
+                if state != last_state or state[0] == "processing":
+                    progress_step, progress_percent, progress_message = _progress_for_record(record)
+                    fingerprint = (*state, progress_step, progress_percent)
+                    if fingerprint != last_fingerprint:
+                        event = ProgressEvent(
+                            analysis_id=record["analysis_id"],
+                            status=record["status"],
+                            progress_step=progress_step,
+                            progress_percent=progress_percent,
+                            progress_message=progress_message,
+                            updated_at=record["updated_at"],
+                        )
+                        yield _format_sse(event)
+                        last_fingerprint = fingerprint
+                        emitted = True
+                    last_state = state
+                idle_ticks = 0 if emitted else idle_ticks + 1
+
+                if record["status"] in {"done", "failed"}:
+                    break
+
+                yield ": ping\n\n"
+                message = await subscription.next(timeout=_next_poll_delay(record["status"], idle_ticks))
+                if message is not None:
+                    record = {**record, **message}
+                    last_synced = time.monotonic()
+                elif time.monotonic() - last_synced >= SSE_WATCHDOG_SECONDS:
+                    # Jobs run in this process keep the cache current; only a miss needs SQLite.
+                    cached = progress_cache.get(analysis_id)
+                    if cached is not None:
+                        record = {**record, **cached}
+                    else:
+                        record = get_analysis(analysis_id, user_id=resolved_user_id)
+                    last_synced = time.monotonic()
 
     return StreamingResponse(
-        event_stream(),
+        event_stream(initial),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         },
+        # Releases the subscription if the client leaves before the stream starts.
+        background=BackgroundTask(subscription_scope.aclose),
     )
 
 
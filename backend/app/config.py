@@ -1,32 +1,65 @@
 from __future__ import annotations
 
+import math
 import os
+import re
 from dataclasses import dataclass
+from functools import cache, lru_cache
 from pathlib import Path
 
 
+# Horizontal whitespace only: \s would let an empty "KEY=" swallow the next line.
+_ENV_RE = re.compile(r"^[^\S\n]*([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE)
+
+
+def _parse_dotenv(text: str) -> dict[str, str]:
+    values: dict[str, str] = {}
+    for match in _ENV_RE.finditer(text):
+        key, value = match.groups()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        values.setdefault(key, value)
+    return values
+
+
+@lru_cache(maxsize=1)
+def _read_dotenv(path: str, mtime_ns: int) -> dict[str, str]:
+    # mtime_ns is part of the cache key so an edited .env is parsed again.
+    return _parse_dotenv(Path(path).read_text(encoding="utf-8"))
+
+
 def _load_dotenv(path: Path) -> None:
-    if not path.exists():
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
         return
 
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if not key:
-            continue
-        if len(value) >= 2 and value[0] == value[-1] and value[0] in {"'", '"'}:
-            value = value[1:-1]
-        os.environ.setdefault(key, value)
+    values = _read_dotenv(str(path), mtime_ns)
+    # Real environment variables win over .env entries.
+    for key in values.keys() - os.environ.keys():
+        os.environ[key] = values[key]
+
+
+_BOOL_TRUE = frozenset(("1", "true", "yes", "on", "True", "Yes", "On", "TRUE", "YES", "ON"))
+_BOOL_TRUE_LOWER = frozenset(("1", "true", "yes", "on"))
 
 
 def _to_bool(value: str | None, default: bool = False) -> bool:
     if value is None:
         return default
-    return value.strip().lower() in {"1", "true", "yes", "on"}
+    # Exact spellings hit the first set; only unusual casing or padding pays for normalization.
+    return value in _BOOL_TRUE or value.strip().lower() in _BOOL_TRUE_LOWER
+
+
+def _env_int(name: str, default: int, minimum: int | None = None) -> int:
+    value = int(os.getenv(name, str(default)))
+    return value if minimum is None or value >= minimum else minimum
+
+
+def _clamp01(value: float) -> float:
+    if math.isnan(value):
+        return 1.0  # what max(0.0, min(1.0, nan)) gave
+    return 0.0 if value < 0.0 else 1.0 if value > 1.0 else value
 
 
 @dataclass(frozen=True)
@@ -37,7 +70,8 @@ class Settings:
     storage_path: Path
     fallback_path: Path
     max_upload_bytes: int
-    allowed_origins: list[str]
+    allowed_origins: tuple[str, ...]
+    allowed_origins_set: frozenset[str]
     openai_api_key: str | None
     openai_organization: str | None
     openai_project: str | None
@@ -52,8 +86,11 @@ class Settings:
     uncertainty_threshold: float
     use_redis_queue: bool
     redis_url: str
+    sse_min_interval: float
+    sse_max_interval: float
 
     @classmethod
+    @cache
     def load(cls) -> "Settings":
         base_dir = Path(__file__).resolve().parents[1]
         _load_dotenv(base_dir / ".env")
@@ -65,19 +102,20 @@ class Settings:
 
         db_path_raw = Path(db_value)
         storage_path_raw = Path(storage_value)
-        db_path = (base_dir / db_path_raw).resolve() if not db_path_raw.is_absolute() else db_path_raw
-        storage_path = (
-            (base_dir / storage_path_raw).resolve()
-            if not storage_path_raw.is_absolute()
-            else storage_path_raw
-        )
+        db_path = (base_dir / db_path_raw).resolve()
+        storage_path = (base_dir / storage_path_raw).resolve()
 
-        max_upload_mb = int(os.getenv("MISTAKEPATCH_MAX_UPLOAD_MB", "10"))
+        max_upload_mb = _env_int("MISTAKEPATCH_MAX_UPLOAD_MB", 10)
         allowed_origins_env = os.getenv(
             "MISTAKEPATCH_ALLOWED_ORIGINS",
             "http://localhost:3000,http://127.0.0.1:3000,https://mistakepatch-vercel.vercel.app",
         )
-        allowed_origins = [item.strip() for item in allowed_origins_env.split(",") if item.strip()]
+        allowed_origins = tuple(item.strip() for item in allowed_origins_env.split(",") if item.strip())
+        sse_min_interval = max(0.05, float(os.getenv("MISTAKEPATCH_SSE_MIN_INTERVAL", "0.25")))
+        sse_max_interval = max(
+            sse_min_interval,
+            float(os.getenv("MISTAKEPATCH_SSE_MAX_INTERVAL", "5.0")),
+        )
 
         return cls(
             base_dir=base_dir,
@@ -87,26 +125,23 @@ class Settings:
             fallback_path=fallback_path,
             max_upload_bytes=max_upload_mb * 1024 * 1024,
             allowed_origins=allowed_origins,
+            allowed_origins_set=frozenset(allowed_origins),
             openai_api_key=os.getenv("OPENAI_API_KEY"),
             openai_organization=os.getenv("OPENAI_ORGANIZATION"),
             openai_project=os.getenv("OPENAI_PROJECT"),
             openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            openai_timeout_seconds=int(os.getenv("OPENAI_TIMEOUT_SECONDS", "25")),
+            openai_timeout_seconds=_env_int("OPENAI_TIMEOUT_SECONDS", 25),
             groq_api_key=os.getenv("GROQ_API_KEY"),
             groq_model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
             groq_base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
             enable_ocr_hints=_to_bool(os.getenv("ENABLE_OCR_HINTS"), default=False),
-            consensus_runs=max(1, int(os.getenv("MISTAKEPATCH_CONSENSUS_RUNS", "3"))),
-            consensus_min_agreement=max(
-                0.0,
-                min(1.0, float(os.getenv("MISTAKEPATCH_CONSENSUS_MIN_AGREEMENT", "0.55"))),
-            ),
-            uncertainty_threshold=max(
-                0.0,
-                min(1.0, float(os.getenv("MISTAKEPATCH_UNCERTAINTY_THRESHOLD", "0.6"))),
-            ),
+            consensus_runs=_env_int("MISTAKEPATCH_CONSENSUS_RUNS", 3, minimum=1),
+            consensus_min_agreement=_clamp01(float(os.getenv("MISTAKEPATCH_CONSENSUS_MIN_AGREEMENT", "0.55"))),
+            uncertainty_threshold=_clamp01(float(os.getenv("MISTAKEPATCH_UNCERTAINTY_THRESHOLD", "0.6"))),
             use_redis_queue=_to_bool(os.getenv("USE_REDIS_QUEUE"), default=False),
             redis_url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            sse_min_interval=sse_min_interval,
+            sse_max_interval=sse_max_interval,
         )
 
 
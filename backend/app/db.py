@@ -1,35 +1,133 @@
 from __future__ import annotations
 
+import itertools
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
-from pathlib import Path
+from pathlib import Path, PureWindowsPath
+from typing import Iterator
 
 from .config import settings
 
 
-def _resolve(path: Path) -> Path:
-    if path.is_absolute():
-        return path
-    return (settings.base_dir / path).resolve()
+def ensure_paths() -> None:
+    # Settings.load() already resolved both paths to absolute ones.
+    settings.db_path.parent.mkdir(parents=True, exist_ok=True)
+    settings.storage_path.mkdir(parents=True, exist_ok=True)
 
 
-def ensure_paths() -> None:
-    db_parent = _resolve(settings.db_path).parent
-    db_parent.mkdir(parents=True, exist_ok=True)
-    _resolve(settings.storage_path).mkdir(parents=True, exist_ok=True)
+POOL_SIZE = 40  # anyio's default worker-thread limit, so threadpool routes never wait on each other.
+STATEMENT_CACHE_SIZE = 256
+OPTIMIZE_EVERY_RELEASES = 1000
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA foreign_keys = ON;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -65536;
+PRAGMA wal_autocheckpoint = 4000;
+PRAGMA busy_timeout = 5000;
+"""
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections shared across threads, one borrower at a time."""
+
+    def __init__(self, path: Path, size: int = POOL_SIZE) -> None:
+        self.path = path
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._releases = itertools.count(1)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transaction() issues BEGIN explicitly. Repositories pass module-level
+        # SQL constants, so the per-connection statement cache keeps every compiled query warm.
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.executescript(_CONNECTION_PRAGMAS)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if next(self._releases) % OPTIMIZE_EVERY_RELEASES == 0:
+                # Refreshes planner statistics only where SQLite judges them stale; usually a no-op.
+                conn.execute("PRAGMA optimize")
+            self._idle.put_nowait(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            conn.close()
 
 
-def get_connection() -> sqlite3.Connection:
-    ensure_paths()
-    conn = sqlite3.connect(_resolve(settings.db_path))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(settings.db_path)
+    return _pool
+
+
+def close_connections() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    finally:
+        pool.release(conn)
 
 
 def _table_has_column(conn: sqlite3.Connection, table_name: str, column_name: str) -> bool:
     rows = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
-    return any(row["name"] == column_name for row in rows)
+    # table_info rows are (cid, name, type, notnull, dflt_value, pk).
+    return any(row[1] == column_name for row in rows)
 
 
 def _migrate_submissions_user_id(conn: sqlite3.Connection) -> None:
@@ -39,81 +137,148 @@ def _migrate_submissions_user_id(conn: sqlite3.Connection) -> None:
     conn.execute("UPDATE submissions SET user_id = 'legacy' WHERE user_id IS NULL OR user_id = ''")
 
 
+def _migrate_upload_paths_to_filenames(conn: sqlite3.Connection) -> None:
+    # Older rows stored absolute upload paths; keep only the filename under storage_path.
+    rows = conn.execute(
+        """
+        SELECT id, solution_img_path, problem_img_path
+        FROM submissions
+        WHERE solution_img_path LIKE '%/%' OR solution_img_path LIKE '%\\%'
+           OR problem_img_path LIKE '%/%' OR problem_img_path LIKE '%\\%'
+        """
+    ).fetchall()
+    for submission_id, solution_img_path, problem_img_path in rows:
+        conn.execute(
+            "UPDATE submissions SET solution_img_path = ?, problem_img_path = ? WHERE id = ?",
+            (
+                PureWindowsPath(solution_img_path).name,
+                PureWindowsPath(problem_img_path).name if problem_img_path else problem_img_path,
+                submission_id,
+            ),
+        )
+
+
 @contextmanager
-def transaction() -> sqlite3.Connection:
-    conn = get_connection()
+def read_connection() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for SELECTs only; nothing is committed or rolled back."""
+    pool = _get_pool()
+    conn = pool.acquire()
     try:
         yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
         conn.commit()
-    except Exception:
-        conn.rollback()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
         raise
     finally:
-        conn.close()
+        pool.release(conn)
+
+
+SCHEMA_VERSION = 3
+
+_SCHEMA_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS submissions (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        solution_img_path TEXT NOT NULL,
+        problem_img_path TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analyses (
+        id TEXT PRIMARY KEY,
+        submission_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        score_total REAL,
+        rubric_json TEXT,
+        result_json TEXT,
+        confidence REAL,
+        error_code TEXT,
+        fallback_used INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS mistakes (
+        id TEXT PRIMARY KEY,
+        analysis_id TEXT NOT NULL,
+        order_idx INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        points_deducted REAL NOT NULL,
+        evidence TEXT NOT NULL,
+        fix_instruction TEXT NOT NULL,
+        location_hint TEXT NOT NULL,
+        FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS annotations (
+        id TEXT PRIMARY KEY,
+        analysis_id TEXT NOT NULL,
+        mistake_id TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        shape TEXT NOT NULL,
+        x REAL,
+        y REAL,
+        w REAL,
+        h REAL,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE,
+        FOREIGN KEY (mistake_id) REFERENCES mistakes(id) ON DELETE CASCADE
+    )
+    """,
+)
+
+_SCHEMA_INDEXES = (
+    # Per-analysis lookup in order_idx order (detail, history top tag, re-save delete);
+    # unique because each position holds one mistake.
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_mistakes_unique ON mistakes(analysis_id, order_idx)",
+    # The old analysis_id-only lookup index; idx_mistakes_unique covers it.
+    "DROP INDEX IF EXISTS idx_mistakes_analysis_id",
+    "CREATE INDEX IF NOT EXISTS idx_annotations_analysis_id ON annotations(analysis_id)",
+    "CREATE INDEX IF NOT EXISTS idx_annotations_mistake ON annotations(mistake_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_submissions_user_created_at ON submissions(user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses(created_at DESC)",
+    # Covers list_history's top-k scan so it never has to visit the analyses table rows.
+    "CREATE INDEX IF NOT EXISTS idx_analyses_history "
+    "ON analyses(created_at DESC, id, submission_id, score_total, status)",
+)
 
 
 def init_db() -> None:
+    """Create or upgrade the schema, at most once per schema version."""
+    with get_connection() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
     with transaction() as conn:
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS submissions (
-                id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                subject TEXT NOT NULL,
-                solution_img_path TEXT NOT NULL,
-                problem_img_path TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS analyses (
-                id TEXT PRIMARY KEY,
-                submission_id TEXT NOT NULL,
-                status TEXT NOT NULL,
-                score_total REAL,
-                rubric_json TEXT,
-                result_json TEXT,
-                confidence REAL,
-                error_code TEXT,
-                fallback_used INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS mistakes (
-                id TEXT PRIMARY KEY,
-                analysis_id TEXT NOT NULL,
-                order_idx INTEGER NOT NULL,
-                type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                points_deducted REAL NOT NULL,
-                evidence TEXT NOT NULL,
-                fix_instruction TEXT NOT NULL,
-                location_hint TEXT NOT NULL,
-                FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS annotations (
-                id TEXT PRIMARY KEY,
-                analysis_id TEXT NOT NULL,
-                mistake_id TEXT NOT NULL,
-                mode TEXT NOT NULL,
-                shape TEXT NOT NULL,
-                x REAL,
-                y REAL,
-                w REAL,
-                h REAL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE,
-                FOREIGN KEY (mistake_id) REFERENCES mistakes(id) ON DELETE CASCADE
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_mistakes_analysis_id ON mistakes(analysis_id, order_idx);
-            CREATE INDEX IF NOT EXISTS idx_annotations_analysis_id ON annotations(analysis_id);
-            """
-        )
+        # Re-check under the write lock in case another process finished first.
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        for statement in _SCHEMA_TABLES:
+            conn.execute(statement)
         _migrate_submissions_user_id(conn)
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_submissions_user_created_at ON submissions(user_id, created_at DESC)"
-        )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses(created_at DESC)")
+        _migrate_upload_paths_to_filenames(conn)
+        for statement in _SCHEMA_INDEXES:
+            conn.execute(statement)
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            # Give the planner statistics once so it considers the covering index.
+            conn.execute("ANALYZE")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
@@ -1,33 +1,66 @@
 from __future__ import annotations
 
+import os
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
 
 from .api.routes import router
 from .config import settings
-from .db import ensure_paths, init_db
+from .db import close_connections, ensure_paths, init_db
+from .services.analyzer import process_analysis_job
+from .services.queue_manager import queue_manager
+
+
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class CachedStaticFiles(StaticFiles):
+    """Serves uploads as immutable: their random names are never reused for other content."""
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={"Cache-Control": UPLOAD_CACHE_CONTROL},
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     ensure_paths()
     init_db()
-    yield
+    queue_manager.local_jobs.start(process_analysis_job)
+    try:
+        yield
+    finally:
+        await queue_manager.local_jobs.stop()
+        close_connections()
 
 
 def create_app() -> FastAPI:
-    ensure_paths()
-    init_db()
-
     app = FastAPI(title="MistakePatch API", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.allowed_origins,
+        # CORSMiddleware only tests membership, so the frozenset makes each origin check O(1).
+        allow_origins=settings.allowed_origins_set,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -35,9 +68,12 @@ def create_app() -> FastAPI:
 
     app.include_router(router)
 
-    uploads_path = Path(settings.storage_path)
-    uploads_path.mkdir(parents=True, exist_ok=True)
-    app.mount("/uploads", StaticFiles(directory=str(uploads_path)), name="uploads")
+    # lifespan creates the directory (ensure_paths) after the app is built, so skip the check here.
+    app.mount(
+        "/uploads",
+        CachedStaticFiles(directory=str(settings.storage_path), check_dir=False),
+        name="uploads",
+    )
 
     return app
 
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+# Kept free of pydantic so schema-only consumers can import it cheaply;
+# models.MistakeType is built from this tuple.
+MISTAKE_TYPES: tuple[str, ...] = (
+    "CONDITION_MISSED",
+    "SIGN_ERROR",
+    "UNIT_ERROR",
+    "DEFINITION_CONFUSION",
+    "ALGEBRA_ERROR",
+    "LOGIC_GAP",
+    "CASE_MISS",
+    "GRAPH_MISREAD",
+    "ARITHMETIC_ERROR",
+    "FINAL_FORM_ERROR",
+)
+MISTAKE_TYPES_SET: frozenset[str] = frozenset(MISTAKE_TYPES)
+# Ordinal <-> tag lookups; the tuple itself serves the reverse direction.
+MISTAKE_TYPE_INDEX: dict[str, int] = {value: index for index, value in enumerate(MISTAKE_TYPES)}
+MISTAKE_TYPE_FROM_INDEX: tuple[str, ...] = MISTAKE_TYPES
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Literal
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, ConfigDict, Field, conlist, confloat
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from .mistake_types import MISTAKE_TYPES
 
 
 class Subject(str, Enum):
@@ -34,17 +36,16 @@ class AnswerVerdict(str, Enum):
     unknown = "unknown"
 
 
-class MistakeType(str, Enum):
-    condition_missed = "CONDITION_MISSED"
-    sign_error = "SIGN_ERROR"
-    unit_error = "UNIT_ERROR"
-    definition_confusion = "DEFINITION_CONFUSION"
-    algebra_error = "ALGEBRA_ERROR"
-    logic_gap = "LOGIC_GAP"
-    case_miss = "CASE_MISS"
-    graph_misread = "GRAPH_MISREAD"
-    arithmetic_error = "ARITHMETIC_ERROR"
-    final_form_error = "FINAL_FORM_ERROR"
+# String caps shared with analysis_result.schema.json (tests/test_schemas.py
+# keeps the two in step).
+_MAX_EVIDENCE = 240
+_MAX_HINT = 120
+_MAX_CHANGE = 220
+_MAX_RATIONALE = 160
+_MAX_BRIEF = 600
+_MAX_VERDICT_REASON = 120
+
+MistakeType = Enum("MistakeType", {value.lower(): value for value in MISTAKE_TYPES}, type=str)
 
 
 class AnalysisMeta(BaseModel):
@@ -71,49 +72,52 @@ class Mistake(BaseModel):
     mistake_id: str | None = None
     type: MistakeType
     severity: Severity
-    points_deducted: confloat(ge=0, le=2)
-    evidence: str = Field(min_length=1, max_length=240)
-    fix_instruction: str = Field(min_length=1, max_length=240)
-    location_hint: str = Field(min_length=1, max_length=120)
+    points_deducted: Annotated[float, Field(ge=0, le=2)]
+    evidence: str = Field(min_length=1, max_length=_MAX_EVIDENCE)
+    fix_instruction: str = Field(min_length=1, max_length=_MAX_EVIDENCE)
+    location_hint: str = Field(min_length=1, max_length=_MAX_HINT)
     highlight: Highlight = Field(default_factory=Highlight)
 
 
 class RubricScores(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    conditions: confloat(ge=0, le=2)
-    modeling: confloat(ge=0, le=2)
-    logic: confloat(ge=0, le=2)
-    calculation: confloat(ge=0, le=2)
-    final: confloat(ge=0, le=2)
+    conditions: Annotated[float, Field(ge=0, le=2)]
+    modeling: Annotated[float, Field(ge=0, le=2)]
+    logic: Annotated[float, Field(ge=0, le=2)]
+    calculation: Annotated[float, Field(ge=0, le=2)]
+    final: Annotated[float, Field(ge=0, le=2)]
 
 
 class PatchChange(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    change: str = Field(min_length=1, max_length=220)
-    rationale: str = Field(min_length=1, max_length=160)
+    change: str = Field(min_length=1, max_length=_MAX_CHANGE)
+    rationale: str = Field(min_length=1, max_length=_MAX_RATIONALE)
 
 
 class Patch(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    minimal_changes: conlist(PatchChange, min_length=1, max_length=6)
-    patched_solution_brief: str = Field(min_length=1, max_length=600)
+    minimal_changes: Annotated[list[PatchChange], Field(min_length=1, max_length=6)]
+    patched_solution_brief: str = Field(min_length=1, max_length=_MAX_BRIEF)
 
 
 class AnalysisResult(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
-    score_total: confloat(ge=0, le=10)
+    score_total: Annotated[float, Field(ge=0, le=10)]
     rubric_scores: RubricScores
-    mistakes: conlist(Mistake, min_length=0, max_length=20)
+    mistakes: Annotated[list[Mistake], Field(max_length=20)]
     patch: Patch
-    next_checklist: conlist(str, min_length=1, max_length=3)
-    confidence: confloat(ge=0, le=1)
+    next_checklist: Annotated[list[str], Field(min_length=1, max_length=3)]
+    confidence: Annotated[float, Field(ge=0, le=1)]
     missing_info: list[str] = Field(default_factory=list, max_length=6)
     answer_verdict: AnswerVerdict = AnswerVerdict.unknown
-    answer_verdict_reason: str = Field(default="정오 판단 정보가 부족합니다.", min_length=1, max_length=120)
+    answer_verdict_reason: str = Field(default="정오 판단 정보가 부족합니다.", min_length=1, max_length=_MAX_VERDICT_REASON)
+
+
+ANALYSIS_RESULT_ADAPTER = TypeAdapter(AnalysisResult)
 
 
 class AnalyzeStatus(str, Enum):
@@ -137,6 +141,15 @@ class AnalyzeResponse(BaseModel):
     result: AnalysisResult | None = None
 
 
+class ProgressEvent(BaseModel):
+    analysis_id: str
+    status: AnalyzeStatus
+    progress_step: ProgressStep
+    progress_percent: int = Field(ge=0, le=100)
+    progress_message: str
+    updated_at: str
+
+
 class AnalyzeDetailResponse(BaseModel):
     analysis_id: str
     submission_id: str
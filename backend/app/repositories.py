@@ -1,15 +1,174 @@
 from __future__ import annotations
 
 import json
-import uuid
-from datetime import UTC, datetime
+import os
+import sqlite3
+import time
 from typing import Any
 
-from .db import get_connection, transaction
+from .db import read_connection, transaction
+from .models import ANALYSIS_RESULT_ADAPTER, AnalysisResult
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+_SQL_INSERT_SUBMISSION = """
+INSERT INTO submissions (id, user_id, created_at, subject, solution_img_path, problem_img_path)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_ANALYSIS = """
+INSERT INTO analyses (
+    id, submission_id, status, score_total, rubric_json, result_json, confidence,
+    error_code, fallback_used, created_at, updated_at
+) VALUES (?, ?, 'queued', NULL, NULL, NULL, NULL, NULL, 0, ?, ?)
+"""
+_SQL_SET_ANALYSIS_STATUS = """
+UPDATE analyses
+SET status = ?, error_code = ?, updated_at = ?
+WHERE id = ?
+"""
+_SQL_SAVE_ANALYSIS_RESULT = """
+UPDATE analyses
+SET status = 'done',
+    score_total = ?,
+    rubric_json = ?,
+    result_json = ?,
+    confidence = ?,
+    fallback_used = ?,
+    error_code = ?,
+    updated_at = ?
+WHERE id = ?
+"""
+_SQL_INSERT_MISTAKE = """
+INSERT INTO mistakes (
+    id, analysis_id, order_idx, type, severity, points_deducted,
+    evidence, fix_instruction, location_hint
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_HAS_MISTAKES = "SELECT 1 FROM mistakes WHERE analysis_id = ? LIMIT 1"
+_SQL_DELETE_MISTAKES = "DELETE FROM mistakes WHERE analysis_id = ?"
+_SQL_MARK_ANALYSIS_FAILED = """
+UPDATE analyses
+SET status = 'failed', error_code = ?, updated_at = ?
+WHERE id = ?
+"""
+_SQL_SELECT_SUBMISSION = """
+SELECT id, user_id, created_at, subject, solution_img_path, problem_img_path
+FROM submissions
+WHERE id = ? AND user_id = ?
+"""
+_SQL_SELECT_ANALYSIS = """
+SELECT a.id, a.submission_id, a.status, a.result_json, a.error_code, a.fallback_used,
+       a.created_at, a.updated_at,
+       s.subject, s.solution_img_path, s.problem_img_path,
+       (
+           SELECT json_group_array(json_array(order_idx, id))
+           FROM mistakes
+           WHERE analysis_id = a.id
+       ) AS mistake_ids_json,
+       (
+           SELECT json_group_array(
+               json_object('mistake_id', mistake_id, 'mode', mode, 'shape', shape, 'x', x, 'y', y, 'w', w, 'h', h)
+           )
+           FROM (
+               SELECT *, ROW_NUMBER() OVER (PARTITION BY mistake_id ORDER BY created_at DESC) AS rn
+               FROM annotations
+               WHERE analysis_id = a.id
+           )
+           WHERE rn = 1
+       ) AS annotations_json
+FROM analyses a
+INNER JOIN submissions s ON s.id = a.submission_id
+WHERE a.id = ? AND s.user_id = ?
+"""
+_SQL_INSERT_ANNOTATION = """
+INSERT INTO annotations (id, analysis_id, mistake_id, mode, shape, x, y, w, h, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_MISTAKE_EXISTS = """
+SELECT 1
+FROM mistakes m
+INNER JOIN analyses a ON a.id = m.analysis_id
+INNER JOIN submissions s ON s.id = a.submission_id
+WHERE m.analysis_id = ? AND m.id = ? AND s.user_id = ?
+"""
+_SQL_HISTORY_ITEMS = """
+SELECT a.id AS analysis_id,
+       s.subject AS subject,
+       a.score_total AS score_total,
+       a.status AS status,
+       a.created_at AS created_at,
+       (SELECT type FROM mistakes WHERE analysis_id = a.id ORDER BY order_idx LIMIT 1) AS top_tag
+FROM analyses a
+INNER JOIN submissions s ON s.id = a.submission_id
+WHERE s.user_id = ?
+ORDER BY a.created_at DESC
+LIMIT ?
+"""
+_SQL_HISTORY_TOP_TAGS = """
+SELECT m.type AS type, COUNT(*) AS count
+FROM mistakes m
+INNER JOIN analyses a ON a.id = m.analysis_id
+INNER JOIN submissions s ON s.id = a.submission_id
+WHERE a.status = 'done'
+  AND s.user_id = ?
+GROUP BY m.type
+ORDER BY count DESC
+LIMIT 3
+"""
+
+
+def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _json_loads(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _time_ordered_hex() -> str:
+    # UUIDv7-style: 48-bit millisecond timestamp then 80 random bits, 32 hex chars like uuid4().hex.
+    # New primary keys land on the rightmost B-tree page instead of a random leaf.
+    return f"{time.time_ns() // 1_000_000:012x}{os.urandom(10).hex()}"
 
 
 def _now_iso() -> str:
-    return datetime.now(UTC).isoformat()
+    # Same text as datetime.now(UTC).isoformat(), minus the datetime object, and always
+    # with six fractional digits so stored timestamps sort lexicographically.
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{micros:06d}+00:00"
+
+
+def _insert_submission(
+    conn: sqlite3.Connection,
+    subject: str,
+    solution_img_path: str,
+    problem_img_path: str | None,
+    user_id: str,
+    now: str,
+) -> str:
+    submission_id = f"s_{_time_ordered_hex()}"
+    conn.execute(
+        _SQL_INSERT_SUBMISSION,
+        (submission_id, user_id, now, subject, solution_img_path, problem_img_path),
+    )
+    return submission_id
+
+
+def _insert_analysis(conn: sqlite3.Connection, submission_id: str, now: str) -> str:
+    analysis_id = f"a_{_time_ordered_hex()}"
+    conn.execute(
+        _SQL_INSERT_ANALYSIS,
+        (analysis_id, submission_id, now, now),
+    )
+    return analysis_id
 
 
 def create_submission(
@@ -18,71 +177,59 @@ def create_submission(
     problem_img_path: str | None,
     user_id: str,
 ) -> str:
-    submission_id = f"s_{uuid.uuid4().hex}"
     with transaction() as conn:
-        conn.execute(
-            """
-            INSERT INTO submissions (id, user_id, created_at, subject, solution_img_path, problem_img_path)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (submission_id, user_id, _now_iso(), subject, solution_img_path, problem_img_path),
-        )
-    return submission_id
+        return _insert_submission(conn, subject, solution_img_path, problem_img_path, user_id, _now_iso())
 
 
 def create_analysis(submission_id: str) -> str:
-    analysis_id = f"a_{uuid.uuid4().hex}"
+    with transaction() as conn:
+        return _insert_analysis(conn, submission_id, _now_iso())
+
+
+def create_submission_and_analysis(
+    subject: str,
+    solution_img_path: str,
+    problem_img_path: str | None,
+    user_id: str,
+) -> tuple[str, str]:
+    """Insert a submission and its queued analysis in a single transaction."""
     now = _now_iso()
     with transaction() as conn:
-        conn.execute(
-            """
-            INSERT INTO analyses (
-                id, submission_id, status, score_total, rubric_json, result_json, confidence,
-                error_code, fallback_used, created_at, updated_at
-            ) VALUES (?, ?, 'queued', NULL, NULL, NULL, NULL, NULL, 0, ?, ?)
-            """,
-            (analysis_id, submission_id, now, now),
-        )
-    return analysis_id
+        submission_id = _insert_submission(conn, subject, solution_img_path, problem_img_path, user_id, now)
+        analysis_id = _insert_analysis(conn, submission_id, now)
+    return submission_id, analysis_id
 
 
-def set_analysis_status(analysis_id: str, status: str, error_code: str | None = None) -> None:
+def set_analysis_status(analysis_id: str, status: str, error_code: str | None = None) -> str:
+    updated_at = _now_iso()
     with transaction() as conn:
         conn.execute(
-            """
-            UPDATE analyses
-            SET status = ?, error_code = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (status, error_code, _now_iso(), analysis_id),
+            _SQL_SET_ANALYSIS_STATUS,
+            (status, error_code, updated_at, analysis_id),
         )
+    return updated_at
 
 
 def save_analysis_result(
     analysis_id: str,
-    result: dict[str, Any],
+    result: dict[str, Any] | AnalysisResult,
     fallback_used: bool = False,
     error_code: str | None = None,
-) -> None:
-    rubric_json = json.dumps(result.get("rubric_scores", {}), ensure_ascii=False)
-    result_json = json.dumps(result, ensure_ascii=False)
+) -> str:
+    if isinstance(result, AnalysisResult):
+        # Serialize validated models in pydantic-core rather than through a dict copy.
+        result_json = ANALYSIS_RESULT_ADAPTER.dump_json(result).decode()
+        result = result.model_dump(mode="json")
+    else:
+        result_json = _json_dumps(result)
+    rubric_json = _json_dumps(result.get("rubric_scores", {}))
     score_total = result.get("score_total")
     confidence = result.get("confidence")
+    updated_at = _now_iso()
 
     with transaction() as conn:
         conn.execute(
-            """
-            UPDATE analyses
-            SET status = 'done',
-                score_total = ?,
-                rubric_json = ?,
-                result_json = ?,
-                confidence = ?,
-                fallback_used = ?,
-                error_code = ?,
-                updated_at = ?
-            WHERE id = ?
-            """,
+            _SQL_SAVE_ANALYSIS_RESULT,
             (
                 score_total,
                 rubric_json,
@@ -90,23 +237,22 @@ def save_analysis_result(
                 confidence,
                 1 if fallback_used else 0,
                 error_code,
-                _now_iso(),
+                updated_at,
                 analysis_id,
             ),
         )
 
-        conn.execute("DELETE FROM mistakes WHERE analysis_id = ?", (analysis_id,))
-        for idx, mistake in enumerate(result.get("mistakes", [])):
-            mistake_id = f"m_{uuid.uuid4().hex}"
-            conn.execute(
-                """
-                INSERT INTO mistakes (
-                    id, analysis_id, order_idx, type, severity, points_deducted,
-                    evidence, fix_instruction, location_hint
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+        # A first save has nothing to clear; a re-save must delete so annotations on
+        # the old mistakes cascade away instead of attaching to new content.
+        if conn.execute(_SQL_HAS_MISTAKES, (analysis_id,)).fetchone() is not None:
+            conn.execute(_SQL_DELETE_MISTAKES, (analysis_id,))
+
+        mistakes = result.get("mistakes", [])
+        conn.executemany(
+            _SQL_INSERT_MISTAKE,
+            [
                 (
-                    mistake_id,
+                    f"m_{_time_ordered_hex()}",
                     analysis_id,
                     idx,
                     mistake.get("type"),
@@ -115,127 +261,107 @@ def save_analysis_result(
                     mistake.get("evidence"),
                     mistake.get("fix_instruction"),
                     mistake.get("location_hint"),
-                ),
-            )
+                )
+                for idx, mistake in enumerate(mistakes)
+            ],
+        )
+    return updated_at
 
 
-def mark_analysis_failed(analysis_id: str, error_code: str) -> None:
+def mark_analysis_failed(analysis_id: str, error_code: str) -> str:
+    updated_at = _now_iso()
     with transaction() as conn:
         conn.execute(
-            """
-            UPDATE analyses
-            SET status = 'failed', error_code = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (error_code, _now_iso(), analysis_id),
+            _SQL_MARK_ANALYSIS_FAILED,
+            (error_code, updated_at, analysis_id),
         )
+    return updated_at
 
 
 def get_submission(submission_id: str, user_id: str) -> dict[str, Any] | None:
-    with get_connection() as conn:
+    with read_connection() as conn:
         row = conn.execute(
-            """
-            SELECT id, user_id, created_at, subject, solution_img_path, problem_img_path
-            FROM submissions
-            WHERE id = ? AND user_id = ?
-            """,
+            _SQL_SELECT_SUBMISSION,
             (submission_id, user_id),
         ).fetchone()
-        if not row:
-            return None
-        return dict(row)
+    if not row:
+        return None
+    submission_id, owner_id, created_at, subject, solution_img_path, problem_img_path = row
+    return {
+        "id": submission_id,
+        "user_id": owner_id,
+        "created_at": created_at,
+        "subject": subject,
+        "solution_img_path": solution_img_path,
+        "problem_img_path": problem_img_path,
+    }
 
 
 def get_analysis(analysis_id: str, user_id: str) -> dict[str, Any] | None:
-    with get_connection() as conn:
-        header = conn.execute(
-            """
-            SELECT a.id, a.submission_id, a.status, a.result_json, a.error_code, a.fallback_used,
-                   a.created_at, a.updated_at,
-                   s.subject, s.solution_img_path, s.problem_img_path
-            FROM analyses a
-            INNER JOIN submissions s ON s.id = a.submission_id
-            WHERE a.id = ? AND s.user_id = ?
-            """,
-            (analysis_id, user_id),
-        ).fetchone()
-        if not header:
-            return None
-
-        error_code = header["error_code"]
-
-        result_obj: dict[str, Any] | None = None
-        if header["result_json"]:
-            try:
-                result_obj = json.loads(header["result_json"])
-            except json.JSONDecodeError:
-                result_obj = None
-                if not error_code:
-                    error_code = "CORRUPT_RESULT_JSON"
-                elif "CORRUPT_RESULT_JSON" not in error_code:
-                    error_code = f"{error_code};CORRUPT_RESULT_JSON"
-            else:
-                if isinstance(result_obj, dict):
-                    result_obj.setdefault("answer_verdict", "unknown")
-                    result_obj.setdefault("answer_verdict_reason", "정오 판단 정보가 부족합니다.")
-
-        mistake_rows = conn.execute(
-            """
-            SELECT id, order_idx
-            FROM mistakes
-            WHERE analysis_id = ?
-            ORDER BY order_idx ASC
-            """,
-            (analysis_id,),
-        ).fetchall()
-        annotations = conn.execute(
-            """
-            SELECT mistake_id, mode, shape, x, y, w, h
-            FROM annotations
-            WHERE analysis_id = ?
-            ORDER BY created_at DESC
-            """,
-            (analysis_id,),
-        ).fetchall()
-        annotation_by_mistake = {}
-        for row in annotations:
-            row_dict = dict(row)
-            annotation_by_mistake.setdefault(row_dict["mistake_id"], row_dict)
-
-        if result_obj:
-            for idx, mistake in enumerate(result_obj.get("mistakes", [])):
-                if idx < len(mistake_rows):
-                    mistake_id = mistake_rows[idx]["id"]
-                    mistake["mistake_id"] = mistake_id
-                    annotation = annotation_by_mistake.get(mistake_id)
-                    if annotation:
-                        highlight = dict(mistake.get("highlight") or {})
-                        highlight.update(
-                            {
-                                "mode": annotation["mode"],
-                                "shape": annotation["shape"],
-                                "x": annotation["x"],
-                                "y": annotation["y"],
-                                "w": annotation["w"],
-                                "h": annotation["h"],
-                            }
-                        )
-                        mistake["highlight"] = highlight
-
-        return {
-            "analysis_id": header["id"],
-            "submission_id": header["submission_id"],
-            "status": header["status"],
-            "subject": header["subject"],
-            "solution_img_path": header["solution_img_path"],
-            "problem_img_path": header["problem_img_path"],
-            "result": result_obj,
-            "fallback_used": bool(header["fallback_used"]),
-            "error_code": error_code,
-            "created_at": header["created_at"],
-            "updated_at": header["updated_at"],
+    with read_connection() as conn:
+        header = conn.execute(_SQL_SELECT_ANALYSIS, (analysis_id, user_id)).fetchone()
+    if not header:
+        return None
+
+    (
+        _,
+        submission_id,
+        status,
+        result_json,
+        error_code,
+        fallback_used,
+        created_at,
+        updated_at,
+        subject,
+        solution_img_path,
+        problem_img_path,
+        mistake_ids_json,
+        annotations_json,
+    ) = header
+
+    result_obj: dict[str, Any] | None = None
+    if result_json:
+        try:
+            result_obj = _json_loads(result_json)
+        except json.JSONDecodeError:
+            result_obj = None
+            if not error_code:
+                error_code = "CORRUPT_RESULT_JSON"
+            elif "CORRUPT_RESULT_JSON" not in error_code:
+                error_code = f"{error_code};CORRUPT_RESULT_JSON"
+        else:
+            if isinstance(result_obj, dict):
+                result_obj.setdefault("answer_verdict", "unknown")
+                result_obj.setdefault("answer_verdict_reason", "정오 판단 정보가 부족합니다.")
+
+    if result_obj:
+        # Aggregates don't promise subquery row order, so sort by order_idx here.
+        mistake_ids = [mistake_id for _, mistake_id in sorted(_json_loads(mistake_ids_json))]
+        # The query already keeps only the newest annotation per mistake.
+        annotation_by_mistake = {
+            annotation.pop("mistake_id"): annotation for annotation in _json_loads(annotations_json)
         }
 
+        for mistake_id, mistake in zip(mistake_ids, result_obj.get("mistakes", [])):
+            mistake["mistake_id"] = mistake_id
+            annotation = annotation_by_mistake.get(mistake_id)
+            if annotation:
+                mistake["highlight"] = {**(mistake.get("highlight") or {}), **annotation}
+
+    return {
+        "analysis_id": analysis_id,
+        "submission_id": submission_id,
+        "status": status,
+        "subject": subject,
+        "solution_img_path": solution_img_path,
+        "problem_img_path": problem_img_path,
+        "result": result_obj,
+        "fallback_used": bool(fallback_used),
+        "error_code": error_code,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
 
 def create_annotation(
     analysis_id: str,
@@ -247,68 +373,47 @@ def create_annotation(
     w: float | None,
     h: float | None,
 ) -> str:
-    annotation_id = f"ann_{uuid.uuid4().hex}"
+    annotation_id = f"ann_{_time_ordered_hex()}"
+    now = _now_iso()
     with transaction() as conn:
         conn.execute(
-            """
-            INSERT INTO annotations (id, analysis_id, mistake_id, mode, shape, x, y, w, h, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (annotation_id, analysis_id, mistake_id, mode, shape, x, y, w, h, _now_iso()),
+            _SQL_INSERT_ANNOTATION,
+            (annotation_id, analysis_id, mistake_id, mode, shape, x, y, w, h, now),
         )
     return annotation_id
 
 
 def mistake_exists(analysis_id: str, mistake_id: str, user_id: str) -> bool:
-    with get_connection() as conn:
+    with read_connection() as conn:
         row = conn.execute(
-            """
-            SELECT 1
-            FROM mistakes m
-            INNER JOIN analyses a ON a.id = m.analysis_id
-            INNER JOIN submissions s ON s.id = a.submission_id
-            WHERE m.analysis_id = ? AND m.id = ? AND s.user_id = ?
-            """,
+            _SQL_MISTAKE_EXISTS,
             (analysis_id, mistake_id, user_id),
         ).fetchone()
         return row is not None
 
 
 def list_history(limit: int = 5, user_id: str = "legacy") -> dict[str, Any]:
-    with get_connection() as conn:
+    with read_connection() as conn:
         rows = conn.execute(
-            """
-            SELECT a.id AS analysis_id,
-                   s.subject AS subject,
-                   a.score_total AS score_total,
-                   a.status AS status,
-                   a.created_at AS created_at,
-                   m.type AS top_tag
-            FROM analyses a
-            INNER JOIN submissions s ON s.id = a.submission_id
-            LEFT JOIN mistakes m ON m.analysis_id = a.id AND m.order_idx = 0
-            WHERE s.user_id = ?
-            ORDER BY a.created_at DESC
-            LIMIT ?
-            """,
+            _SQL_HISTORY_ITEMS,
             (user_id, limit),
         ).fetchall()
         tags = conn.execute(
-            """
-            SELECT m.type AS type, COUNT(*) AS count
-            FROM mistakes m
-            INNER JOIN analyses a ON a.id = m.analysis_id
-            INNER JOIN submissions s ON s.id = a.submission_id
-            WHERE a.status = 'done'
-              AND s.user_id = ?
-            GROUP BY m.type
-            ORDER BY count DESC
-            LIMIT 3
-            """,
+            _SQL_HISTORY_TOP_TAGS,
             (user_id,),
         ).fetchall()
 
     return {
-        "items": [dict(row) for row in rows],
-        "top_tags": [dict(row) for row in tags],
+        "items": [
+            {
+                "analysis_id": analysis_id,
+                "subject": subject,
+                "score_total": score_total,
+                "status": status,
+                "created_at": created_at,
+                "top_tag": top_tag,
+            }
+            for analysis_id, subject, score_total, status, created_at, top_tag in rows
+        ],
+        "top_tags": [{"type": tag_type, "count": count} for tag_type, count in tags],
     }
@@ -1,117 +1,200 @@
 from __future__ import annotations
 
-from .models import MistakeType
-
-
-MISTAKE_TYPES = [item.value for item in MistakeType]
-
-ANALYSIS_RESULT_JSON_SCHEMA: dict = {
-    "type": "object",
-    "required": [
-        "score_total",
-        "rubric_scores",
-        "mistakes",
-        "patch",
-        "next_checklist",
-        "confidence",
-        "missing_info",
-        "answer_verdict",
-        "answer_verdict_reason",
-    ],
-    "additionalProperties": False,
-    "properties": {
-        "score_total": {"type": "number", "minimum": 0, "maximum": 10},
-        "rubric_scores": {
-            "type": "object",
-            "required": ["conditions", "modeling", "logic", "calculation", "final"],
-            "additionalProperties": False,
-            "properties": {
-                "conditions": {"type": "number", "minimum": 0, "maximum": 2},
-                "modeling": {"type": "number", "minimum": 0, "maximum": 2},
-                "logic": {"type": "number", "minimum": 0, "maximum": 2},
-                "calculation": {"type": "number", "minimum": 0, "maximum": 2},
-                "final": {"type": "number", "minimum": 0, "maximum": 2},
-            },
-        },
-        "mistakes": {
-            "type": "array",
-            "minItems": 0,
-            "maxItems": 20,
-            "items": {
-                "type": "object",
-                "required": [
-                    "type",
-                    "severity",
-                    "points_deducted",
-                    "evidence",
-                    "fix_instruction",
-                    "location_hint",
-                    "highlight",
-                ],
-                "additionalProperties": False,
-                "properties": {
-                    "type": {"type": "string", "enum": MISTAKE_TYPES},
-                    "severity": {"type": "string", "enum": ["low", "med", "high"]},
-                    "points_deducted": {"type": "number", "minimum": 0, "maximum": 2},
-                    "evidence": {"type": "string", "maxLength": 240},
-                    "fix_instruction": {"type": "string", "maxLength": 240},
-                    "location_hint": {"type": "string", "maxLength": 120},
-                    "highlight": {
-                        "type": "object",
-                        "required": ["mode", "shape", "x", "y", "w", "h"],
-                        "additionalProperties": False,
-                        "properties": {
-                            "mode": {"type": "string", "enum": ["tap", "ocr_box", "region_box"]},
-                            "shape": {"type": "string", "enum": ["circle", "box"]},
-                            "x": {"type": ["number", "null"]},
-                            "y": {"type": ["number", "null"]},
-                            "w": {"type": ["number", "null"]},
-                            "h": {"type": ["number", "null"]},
-                        },
-                    },
-                },
-            },
-        },
-        "patch": {
-            "type": "object",
-            "required": ["minimal_changes", "patched_solution_brief"],
-            "additionalProperties": False,
-            "properties": {
-                "minimal_changes": {
-                    "type": "array",
-                    "minItems": 1,
-                    "maxItems": 6,
-                    "items": {
-                        "type": "object",
-                        "required": ["change", "rationale"],
-                        "additionalProperties": False,
-                        "properties": {
-                            "change": {"type": "string", "maxLength": 220},
-                            "rationale": {"type": "string", "maxLength": 160},
-                        },
-                    },
-                },
-                "patched_solution_brief": {"type": "string", "maxLength": 600},
-            },
-        },
-        "next_checklist": {
-            "type": "array",
-            "minItems": 1,
-            "maxItems": 3,
-            "items": {"type": "string", "maxLength": 80},
-        },
-        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
-        "missing_info": {
-            "type": "array",
-            "maxItems": 6,
-            "items": {"type": "string", "maxLength": 80},
-        },
-        "answer_verdict": {"type": "string", "enum": ["correct", "incorrect", "unknown"]},
-        "answer_verdict_reason": {"type": "string", "maxLength": 120},
-    },
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import best_match
+from jsonschema.validators import extend, validator_for
+
+from .mistake_types import MISTAKE_TYPES, MISTAKE_TYPES_SET
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import jsonschema_rs  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    jsonschema_rs = None
+
+__all__ = (
+    "ANALYSIS_RESULT_JSON_SCHEMA",
+    "ANALYSIS_RESULT_VALIDATOR",
+    "MISTAKE_TYPES",
+    "MISTAKE_TYPES_SET",
+    "SYSTEM_PROMPT",
+    "get_analysis_schema",
+    "get_analysis_validator",
+    "get_validator",
+    "validate_analysis_result",
+)
+
+_ANALYSIS_SCHEMA_PATH = Path(__file__).with_name("analysis_result.schema.json")
+
+
+def _canonicalize(node: Any, shared: dict[str, Any]) -> Any:
+    # Validators look these keywords and enum members up constantly; interned
+    # strings compare by identity. Structurally equal sub-schemas (the 0..2
+    # score fields, the capped strings) are collapsed into one shared object.
+    if isinstance(node, dict):
+        node = {sys.intern(key): _canonicalize(value, shared) for key, value in node.items()}
+    elif isinstance(node, list):
+        node = [_canonicalize(item, shared) for item in node]
+    elif isinstance(node, str):
+        return sys.intern(node)
+    else:
+        return node
+    return shared.setdefault(json.dumps(node, sort_keys=True), node)
+
+
+@lru_cache(maxsize=1)
+def get_analysis_schema() -> dict:
+    """Parse ``analysis_result.schema.json`` on first use and share the result."""
+    raw = _ANALYSIS_SCHEMA_PATH.read_bytes()
+    schema = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return _canonicalize(schema, {})
+
+
+def _freeze(node: Any, frozen: dict[int, Any]) -> Any:
+    # Read-only view for validators; shared sub-schemas stay shared.
+    if not isinstance(node, (dict, list)):
+        return node
+    cached = frozen.get(id(node))
+    if cached is None:
+        if isinstance(node, dict):
+            cached = MappingProxyType({key: _freeze(value, frozen) for key, value in node.items()})
+        else:
+            cached = tuple(_freeze(item, frozen) for item in node)
+        frozen[id(node)] = cached
+    return cached
+
+
+# Allowed key sets for closed object schemas, keyed by id() of the (frozen,
+# never collected) sub-schema that declares them.
+_ALLOWED_KEYS: dict[int, frozenset[str]] = {}
+
+
+def _allowed_keys(schema: Any) -> frozenset[str]:
+    allowed = _ALLOWED_KEYS.get(id(schema))
+    if allowed is None:
+        allowed = _ALLOWED_KEYS[id(schema)] = frozenset(schema.get("properties", ()))
+    return allowed
+
+
+@lru_cache(maxsize=None)
+def _with_closed_object_fast_path(validator_cls: Any) -> Any:
+    base = validator_cls.VALIDATORS["additionalProperties"]
+
+    def additional_properties(validator: Any, additional: Any, instance: Any, schema: Any) -> Any:
+        # One subset test per object; the stock keyword is only consulted to
+        # describe the offending keys.
+        if (
+            additional is False
+            and "patternProperties" not in schema
+            and validator.is_type(instance, "object")
+            and instance.keys() <= _allowed_keys(schema)
+        ):
+            return
+        yield from base(validator, additional, instance, schema)
+
+    return extend(validator_cls, {"additionalProperties": additional_properties})
+
+
+# Keyed by id(): cached schemas are never mutated, so identity is enough and
+# avoids serializing the schema to build a key. The schema is kept alongside
+# its validator so the id cannot be recycled while the entry lives.
+_VALIDATOR_CACHE: dict[int, tuple[dict, Any]] = {}
+
+
+def get_validator(schema: dict) -> Any:
+    """Return a checked validator for ``schema``, building it on first use."""
+    cached = _VALIDATOR_CACHE.get(id(schema))
+    if cached is not None:
+        return cached[1]
+    validator_cls = validator_for(schema, default=Draft202012Validator)
+    validator_cls.check_schema(schema)
+    validator_cls = _with_closed_object_fast_path(validator_cls)
+    # The validator works on a frozen copy, so callers mutating the dict they
+    # hand to the OpenAI SDK cannot change what cached validators enforce.
+    validator = validator_cls(_freeze(schema, {}))
+    _VALIDATOR_CACHE[id(schema)] = (schema, validator)
+    return validator
+
+
+def get_analysis_validator() -> Any:
+    return get_validator(get_analysis_schema())
+
+
+RUBRIC_KEYS: frozenset[str] = frozenset(("conditions", "modeling", "logic", "calculation", "final"))
+RUBRIC_SCORE_MAX = 2
+
+
+def _rubric_scores_valid(rubric: Any) -> bool:
+    # Straight-line equivalent of $defs.RubricScores: exactly five numbers in 0..2.
+    if type(rubric) is not dict or rubric.keys() != RUBRIC_KEYS:
+        return False
+    for value in rubric.values():
+        if type(value) not in (int, float) or not 0 <= value <= RUBRIC_SCORE_MAX:
+            return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def _get_analysis_validator_without_rubric() -> Any:
+    schema = get_analysis_schema()
+    return get_validator({**schema, "$defs": {**schema["$defs"], "RubricScores": True}})
+
+
+@lru_cache(maxsize=1)
+def _get_rust_analysis_validator() -> Any:
+    if jsonschema_rs is None:
+        return None
+    try:
+        return jsonschema_rs.Draft202012Validator(get_analysis_schema())
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+
+
+def validate_analysis_result(instance: Any) -> None:
+    """Raise the most relevant ``ValidationError`` if ``instance`` violates the result schema."""
+    # jsonschema-rs, when installed, accepts valid results without touching
+    # Python-level keyword code; rejections are re-checked by jsonschema so
+    # callers keep getting the same error type and messages.
+    rust_validator = _get_rust_analysis_validator()
+    if rust_validator is not None and rust_validator.is_valid(instance):
+        return
+    if (
+        isinstance(instance, dict)
+        and _rubric_scores_valid(instance.get("rubric_scores"))
+        and _get_analysis_validator_without_rubric().is_valid(instance)
+    ):
+        return
+    error = best_match(get_analysis_validator().iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+_LAZY_ATTRS = {
+    "ANALYSIS_RESULT_JSON_SCHEMA": get_analysis_schema,
+    "ANALYSIS_RESULT_VALIDATOR": get_analysis_validator,
 }
 
 
+def __getattr__(name: str) -> Any:
+    loader = _LAZY_ATTRS.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Bind the result so later lookups are plain module attribute hits.
+    value = globals()[name] = loader()
+    return value
+
+
 SYSTEM_PROMPT = """
 You are MistakePatch, a strict grading assistant for handwritten math/physics solutions.
 
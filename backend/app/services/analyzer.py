@@ -1,23 +1,32 @@
 from __future__ import annotations
 
-import ast
+import heapq
 import json
 import math
-from numbers import Number
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from statistics import median
 from typing import Any
 
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
 
 from ..config import settings
 from ..models import AnalysisResult, AnswerVerdict, MistakeType, Severity
 from ..repositories import mark_analysis_failed, save_analysis_result, set_analysis_status
-from ..schemas import ANALYSIS_RESULT_JSON_SCHEMA
+from ..schemas import MISTAKE_TYPES_SET, validate_analysis_result
 from .ocr import extract_image_lines, extract_image_text, suggest_ocr_boxes
 from .openai_service import OpenAIService
+from .progress_cache import progress_cache
+from .queue_manager import queue_manager
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
 
 
 @dataclass(frozen=True)
@@ -67,13 +76,103 @@ class LinearEquation:
     raw: str
 
 
+# Per-job cap on in-flight model calls; the local pool already runs several jobs at once.
+MAX_CONCURRENT_LLM_RUNS = 4
 _PROVENANCE_PATTERN = re.compile(
     r"\[step:(?P<step>[^\]]+)\]\s*\[rule:(?P<rule>[^\]]+)\]\s*(?P<body>.*)",
     flags=re.IGNORECASE,
 )
 _OUTPUT_PROVENANCE_TAG_PATTERN = re.compile(r"\[(?:step|rule)\s*:?\s*[^\]]+\]", flags=re.IGNORECASE)
-_ALLOWED_EXPR_CHARS = re.compile(r"^[0-9xX\+\-\*/\(\)\.\s]+$")
-_ALLOWED_EQUATION_CHARS = re.compile(r"^[0-9xX\+\-\*/\(\)\.\s=<>]+$")
+# Callers strip whitespace first, so a character-set check replaces the regex.
+_ALLOWED_EXPR_CHARS = frozenset("0123456789xX+-*/().")
+_ALLOWED_EQUATION_CHARS = _ALLOWED_EXPR_CHARS | frozenset("=<>")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_MATH_EXPRESSION_PATTERN = re.compile(r"(?:\d+\s*/\s*\d+|[\^=√]|\\frac|\\sqrt|[a-zA-Z]\s*[=]|[(){}\[\]])")
+_UNPARENTHESIZED_EXPONENT_PATTERN = re.compile(r"\^(\d+\s*/\s*\d+)\)")
+_CLAUSE_BREAK_PATTERN = re.compile(r"(?:[.!?]| 그리고 | 또한 | 따라서 | 그러므로 | 이후 | 및 | with )")
+_EQUATION_LIST_SEPARATOR_PATTERN = re.compile(r"[;,]")
+_EQUATION_SEGMENT_BREAK_PATTERN = re.compile(r"(?<=\d)\s+(?=[xX×✕✖χΧⅹｘ]\s*[\+\-\=])")
+_VARIABLE_TOKEN_PATTERN = re.compile(r"[xX×✕✖χΧⅹｘ]")
+_STEP_ID_PATTERN = re.compile(r"^[sS](\d+)$")
+_DIGIT_RUN_PATTERN = re.compile(r"\d+")
+# OCR look-alikes, all single characters, so each pass is one str.translate.
+_OCR_SYMBOL_TABLE = str.maketrans(
+    {
+        "−": "-",
+        "—": "-",
+        "–": "-",
+        "＝": "=",
+        "⇒": "=",
+        "→": "=",
+        "⟶": "=",
+        "÷": "/",
+        **dict.fromkeys("×✕✖χΧⅹｘX", "x"),
+    }
+)
+_OCR_DIGIT_TABLE = str.maketrans(
+    {
+        "O": "0",
+        "o": "0",
+        "I": "1",
+        "l": "1",
+        "|": "1",
+        "S": "5",
+        "B": "8",
+        "Z": "2",
+    }
+)
+# The two tables touch disjoint characters, so their union applies both passes.
+_OCR_MATH_TABLE = {**_OCR_SYMBOL_TABLE, **_OCR_DIGIT_TABLE}
+# Math table plus the decimal-comma fix and whitespace removal. re's \s is exactly
+# str.isspace(), and the last such code point is U+3000 (ideographic space).
+_OCR_EQUATION_TABLE = {
+    **_OCR_MATH_TABLE,
+    ord(","): ".",
+    **{code: None for code in range(0x3001) if chr(code).isspace()},
+}
+_DIRECT_LINEAR_EQ_PATTERN = re.compile(r"([+-]?\d*(?:\.\d+)?)x([+-]\d+(?:\.\d+)?)?=([+-]?\d+(?:\.\d+)?)")
+_SWAPPED_LINEAR_EQ_PATTERN = re.compile(r"([+-]?\d+(?:\.\d+)?)=([+-]?\d*(?:\.\d+)?)x([+-]\d+(?:\.\d+)?)?")
+_DIVIDED_LINEAR_EQ_PATTERN = re.compile(r"x/([+-]?\d+(?:\.\d+)?)=([+-]?\d+(?:\.\d+)?)")
+_X_ASSIGNMENT_PATTERN = re.compile(r"x\s*=\s*([^\n\r;,\]]+)")
+_RHS_VALUE_PATTERN = re.compile(r"=\s*([^\n\r;,\]]+)")
+_DIGIT_TIMES_X_PATTERN = re.compile(r"(?<=\d)x(?=\d|\()", flags=re.IGNORECASE)
+_PAREN_TIMES_X_PATTERN = re.compile(r"(?<=\))x(?=\d|\()", flags=re.IGNORECASE)
+_NUMERIC_EXPR_PATTERN = re.compile(r"[\+\-\*/\(\)\.\d]+")
+_NUMERIC_EXPR_CHARS = frozenset("0123456789+-*/().")
+# Plain signed decimals that Python itself would accept as literals ("07" is a SyntaxError).
+_SIGNED_DECIMAL_PATTERN = re.compile(r"[+-]?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?")
+# The trailing "." alternative swallows any other character so the tokenizer can reject it.
+_ARITHMETIC_TOKEN_PATTERN = re.compile(r"[0-9]+\.?[0-9]*|\.[0-9]+|[xX][xX0-9]*|\*\*|//|[-+*/()]|.", flags=re.DOTALL)
+_IMPLICIT_MUL_DIGIT_X_PATTERN = re.compile(r"(\d)(x)", flags=re.IGNORECASE)
+_IMPLICIT_MUL_PAREN_PATTERN = re.compile(r"(\))(\d|x)", flags=re.IGNORECASE)
+_IMPLICIT_MUL_OPEN_PAREN_PATTERN = re.compile(r"(\d|\))\(", flags=re.IGNORECASE)
+_IMPLICIT_MUL_X_PAREN_PATTERN = re.compile(r"x\(", flags=re.IGNORECASE)
+_WORD_TOKEN_PATTERN = re.compile(r"[0-9a-zA-Z가-힣]+")
+_VALID_SEVERITIES = frozenset(member.value for member in Severity)
+# Plain-string aliases for enum values used throughout the guardrails.
+_SEV_LOW = Severity.low.value
+_SEV_MED = Severity.med.value
+_SEV_HIGH = Severity.high.value
+_SEVERITY_RANK = {_SEV_LOW: 0, _SEV_MED: 1, _SEV_HIGH: 2}
+# (low, high] deduction ranges that _normalize_points_by_severity and the 0..2 clamp leave
+# untouched; the open lower bound keeps -0.0 on the clamping path.
+_SEVERITY_POINT_BANDS = {_SEV_LOW: (0.0, 0.6), _SEV_MED: (0.4, 2.0), _SEV_HIGH: (1.0, 2.0)}
+# Spellings models actually emit; anything else takes the strip/lower path.
+_SEV_LOOKUP = {
+    spelling: value
+    for value in (_SEV_LOW, _SEV_MED, _SEV_HIGH)
+    for spelling in (value, value.upper(), value.capitalize())
+}
+_CONDITION_MISSED = MistakeType.condition_missed.value
+_SIGN_ERROR = MistakeType.sign_error.value
+_UNIT_ERROR = MistakeType.unit_error.value
+_DEFINITION_CONFUSION = MistakeType.definition_confusion.value
+_ALGEBRA_ERROR = MistakeType.algebra_error.value
+_LOGIC_GAP = MistakeType.logic_gap.value
+_CASE_MISS = MistakeType.case_miss.value
+_GRAPH_MISREAD = MistakeType.graph_misread.value
+_ARITHMETIC_ERROR = MistakeType.arithmetic_error.value
+_FINAL_FORM_ERROR = MistakeType.final_form_error.value
 _DEFAULT_GENERIC_EVIDENCE = {
     "근거가 부족해 보완 설명이 필요합니다.",
     "핵심 감점 구간을 한 줄씩 다시 전개해 수정하세요.",
@@ -86,7 +185,7 @@ def process_analysis_job(payload: dict[str, Any]) -> None:
     solution_image_path = payload["solution_image_path"]
     problem_image_path = payload.get("problem_image_path")
 
-    set_analysis_status(analysis_id, "processing")
+    _publish_progress(analysis_id, "processing", set_analysis_status(analysis_id, "processing"))
     fallback_used = False
     error_code: str | None = None
     consensus_meta = ConsensusMeta(runs_requested=1, runs_used=1, agreement=1.0, score_spread=0.0)
@@ -105,10 +204,21 @@ def process_analysis_job(payload: dict[str, Any]) -> None:
             joined = "; ".join(validation_errors)[:200]
             raise RuntimeError(f"all_consensus_runs_invalid:{joined or 'unknown'}")
 
-        validated, consensus_meta = _merge_consensus_results(
-            validated_runs=validated_runs,
-            runs_requested=max(1, settings.consensus_runs),
-        )
+        runs_requested = max(1, settings.consensus_runs)
+        if len(validated_runs) == 1:
+            # Nothing to vote on; _validate_result already returned a fresh dict.
+            validated = validated_runs[0]
+            consensus_meta = ConsensusMeta(
+                runs_requested=runs_requested,
+                runs_used=1,
+                agreement=1.0,
+                score_spread=0.0,
+            )
+        else:
+            validated, consensus_meta = _merge_consensus_results(
+                validated_runs=validated_runs,
+                runs_requested=runs_requested,
+            )
     except Exception as exc:
         fallback_used = True
         detail = str(exc).strip().replace("\n", " ")
@@ -132,10 +242,18 @@ def process_analysis_job(payload: dict[str, Any]) -> None:
     _sanitize_output_provenance(validated)
 
     try:
-        save_analysis_result(analysis_id, validated, fallback_used=fallback_used, error_code=error_code)
+        updated_at = save_analysis_result(
+            analysis_id, validated, fallback_used=fallback_used, error_code=error_code
+        )
     except Exception:
-        mark_analysis_failed(analysis_id, "db_write_failed")
+        _publish_progress(analysis_id, "failed", mark_analysis_failed(analysis_id, "db_write_failed"))
         raise
+    _publish_progress(analysis_id, "done", updated_at)
+
+
+def _publish_progress(analysis_id: str, status: str, updated_at: str) -> None:
+    progress_cache.store(analysis_id, status, updated_at)
+    queue_manager.publish_progress(analysis_id, {"status": status, "updated_at": updated_at})
 
 
 def _apply_highlight_mode_policy(result: dict[str, Any], highlight_mode: str) -> None:
@@ -278,18 +396,30 @@ def _get_llm_results(
     runs_requested = max(1, settings.consensus_runs)
     payloads: list[dict[str, Any]] = []
     errors: list[str] = []
-    for _ in range(runs_requested):
+
+    def run_once() -> dict[str, Any]:
+        return service.analyze_solution(
+            solution_image_path=solution_image_path,
+            problem_image_path=problem_image_path,
+            subject=subject,
+            highlight_mode=highlight_mode,
+        )
+
+    if runs_requested == 1:
         try:
-            payloads.append(
-                service.analyze_solution(
-                    solution_image_path=solution_image_path,
-                    problem_image_path=problem_image_path,
-                    subject=subject,
-                    highlight_mode=highlight_mode,
-                )
-            )
+            payloads.append(run_once())
         except Exception as exc:
             errors.append(str(exc))
+    else:
+        # Consensus runs are independent network calls; issue them together and
+        # keep results in run order so merging stays deterministic.
+        with ThreadPoolExecutor(max_workers=min(runs_requested, MAX_CONCURRENT_LLM_RUNS)) as executor:
+            futures = [executor.submit(run_once) for _ in range(runs_requested)]
+            for future in futures:
+                try:
+                    payloads.append(future.result())
+                except Exception as exc:
+                    errors.append(str(exc))
 
     if not payloads:
         joined = "; ".join(errors)[:200]
@@ -326,13 +456,11 @@ def _merge_consensus_results(
                     vals.append(value)
         rubric_merged[key] = round(_clamp(float(median(vals)) if vals else score_median / 5.0, 0.0, 2.0), 2)
 
-    mistake_buckets: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    mistake_buckets: defaultdict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
     for item in validated_runs:
         for mistake in item.get("mistakes", []):
-            if not isinstance(mistake, dict):
-                continue
-            key = _consensus_mistake_key(mistake)
-            mistake_buckets.setdefault(key, []).append(mistake)
+            if isinstance(mistake, dict):
+                mistake_buckets[_consensus_mistake_key(mistake)].append(mistake)
 
     vote_threshold = max(1, math.ceil(len(validated_runs) / 2))
     merged_mistakes: list[dict[str, Any]] = []
@@ -343,7 +471,7 @@ def _merge_consensus_results(
             bucket,
             key=lambda item: (
                 _to_float(item.get("points_deducted")) or 0.0,
-                _severity_rank(str(item.get("severity") or Severity.low.value)),
+                _severity_rank(str(item.get("severity") or _SEV_LOW)),
             ),
             reverse=True,
         )
@@ -355,24 +483,21 @@ def _merge_consensus_results(
         )
         merged_mistakes.append(representative)
 
-    merged_mistakes.sort(
-        key=lambda item: (_to_float(item.get("points_deducted")) or 0.0, item.get("type", "")),
-        reverse=True,
-    )
-
     mistake_agreement = (
         len(merged_mistakes) / len(mistake_buckets) if mistake_buckets else 1.0
     )
+    # Same ordering as sorted(..., reverse=True)[:20], without sorting the tail.
+    merged_mistakes = heapq.nlargest(
+        20,
+        merged_mistakes,
+        key=lambda item: (_to_float(item.get("points_deducted")) or 0.0, item.get("type", "")),
+    )
     agreement = round(_clamp((score_agreement + mistake_agreement) / 2.0, 0.0, 1.0), 2)
 
     chosen = min(
         validated_runs,
         key=lambda item: abs((_to_float(item.get("score_total")) or 0.0) - score_median),
     )
-    merged = dict(chosen)
-    merged["score_total"] = score_median
-    merged["rubric_scores"] = rubric_merged
-    merged["mistakes"] = merged_mistakes[:20]
 
     checklist_votes: dict[str, int] = {}
     for item in validated_runs:
@@ -384,31 +509,47 @@ def _merge_consensus_results(
             if text:
                 checklist_votes[text] = checklist_votes.get(text, 0) + 1
     if checklist_votes:
-        merged["next_checklist"] = [
+        next_checklist = [
             text
-            for text, _ in sorted(checklist_votes.items(), key=lambda pair: (-pair[1], pair[0]))[:3]
+            for text, _ in heapq.nsmallest(3, checklist_votes.items(), key=lambda pair: (-pair[1], pair[0]))
         ]
+    else:
+        next_checklist = chosen.get("next_checklist")
 
     avg_conf = sum((_to_float(item.get("confidence")) or 0.0) for item in validated_runs) / len(validated_runs)
-    merged["confidence"] = round(_clamp(avg_conf - (1.0 - agreement) * 0.25, 0.0, 1.0), 2)
 
     missing: list[str] = []
+    seen_missing: set[str] = set()
     for item in validated_runs:
         info = item.get("missing_info")
         if not isinstance(info, list):
             continue
         for raw in info:
             text = _clean_text(raw, "", 80)
-            if text and text not in missing:
+            if text and text not in seen_missing:
+                seen_missing.add(text)
                 missing.append(text)
     note = _clean_text(
         f"consensus_runs={len(validated_runs)}/{runs_requested}, agreement={agreement:.2f}",
         "",
         80,
     )
-    if note and note not in missing:
+    if note and note not in seen_missing:
         missing.append(note)
-    merged["missing_info"] = missing[:6]
+
+    # Only patch and the verdict come from the chosen run; everything else is
+    # recomputed, so build the result directly instead of copying the run.
+    merged = {
+        "score_total": score_median,
+        "rubric_scores": rubric_merged,
+        "mistakes": merged_mistakes,
+        "patch": chosen.get("patch"),
+        "next_checklist": next_checklist,
+        "confidence": round(_clamp(avg_conf - (1.0 - agreement) * 0.25, 0.0, 1.0), 2),
+        "missing_info": missing[:6],
+        "answer_verdict": chosen.get("answer_verdict"),
+        "answer_verdict_reason": chosen.get("answer_verdict_reason"),
+    }
 
     return merged, ConsensusMeta(
         runs_requested=runs_requested,
@@ -419,22 +560,20 @@ def _merge_consensus_results(
 
 
 def _consensus_mistake_key(mistake: dict[str, Any]) -> tuple[str, str]:
-    mtype = str(mistake.get("type") or MistakeType.logic_gap.value).strip().upper()
+    mtype = str(mistake.get("type") or _LOGIC_GAP).strip().upper()
+    # _clean_text already folds whitespace runs into single spaces.
     location = _clean_text(mistake.get("location_hint"), "풀이 중간 구간", 80).lower()
-    location = re.sub(r"\s+", " ", location)
     return mtype, location
 
 
 def _severity_rank(severity: str) -> int:
-    order = {Severity.low.value: 0, Severity.med.value: 1, Severity.high.value: 2}
-    normalized = _normalize_severity(severity)
-    return order.get(normalized, 0)
+    return _SEVERITY_RANK.get(_normalize_severity(severity), 0)
 
 
 def _validate_result(data: dict[str, Any]) -> dict[str, Any]:
     normalized_input = _normalize_result_candidate(data)
     try:
-        validate(instance=normalized_input, schema=ANALYSIS_RESULT_JSON_SCHEMA)
+        validate_analysis_result(normalized_input)
     except ValidationError as exc:
         raise RuntimeError(f"schema_validation_failed:{exc.message}") from exc
 
@@ -446,39 +585,39 @@ def _validate_result(data: dict[str, Any]) -> dict[str, Any]:
 
 def _normalize_result_candidate(data: dict[str, Any]) -> dict[str, Any]:
     candidate = _unwrap_result_container(data)
-    _apply_aliases(candidate)
-    _normalize_numeric_fields(candidate)
-    _prune_to_schema_shape(candidate)
+    _apply_aliases_and_prune(candidate)
     _ensure_required_defaults(candidate)
     return candidate
 
 
 def _unwrap_result_container(data: dict[str, Any]) -> dict[str, Any]:
+    # Returns the matched dict itself, not a copy: callers hand over freshly
+    # parsed payloads and _normalize_result_candidate mutates the result in place.
     if _looks_like_result_payload(data):
-        return dict(data)
+        return data
 
     preferred_keys = ("analysis_result", "result", "output", "data", "json", "response")
     for key in preferred_keys:
         nested = _coerce_json_object(data.get(key))
         if nested is not None:
             if _looks_like_result_payload(nested) or _looks_like_partial_payload(nested):
-                return dict(nested)
+                return nested
             for child in nested.values():
                 child_obj = _coerce_json_object(child)
                 if child_obj is not None and _looks_like_result_payload(child_obj):
-                    return dict(child_obj)
+                    return child_obj
                 if isinstance(child, list):
                     for item in child:
                         item_obj = _coerce_json_object(item)
                         if item_obj is not None and _looks_like_result_payload(item_obj):
-                            return dict(item_obj)
+                            return item_obj
 
     for value in data.values():
         value_obj = _coerce_json_object(value)
         if value_obj is not None and _looks_like_result_payload(value_obj):
-            return dict(value_obj)
+            return value_obj
 
-    return dict(data)
+    return data
 
 
 def _coerce_json_object(value: Any) -> dict[str, Any] | None:
@@ -491,13 +630,20 @@ def _coerce_json_object(value: Any) -> dict[str, Any] | None:
     return None
 
 
+def _json_loads(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def _parse_json_object(raw: str) -> dict[str, Any] | None:
     text = raw.strip()
     if not text:
         return None
 
     try:
-        parsed = json.loads(text)
+        parsed = _json_loads(text)
         if isinstance(parsed, dict):
             return parsed
     except json.JSONDecodeError:
@@ -505,10 +651,11 @@ def _parse_json_object(raw: str) -> dict[str, Any] | None:
 
     start = text.find("{")
     end = text.rfind("}")
-    if start >= 0 and end > start:
+    # A snippet spanning the whole text was already rejected above.
+    if start >= 0 and end > start and (start > 0 or end < len(text) - 1):
         snippet = text[start : end + 1]
         try:
-            parsed = json.loads(snippet)
+            parsed = _json_loads(snippet)
             if isinstance(parsed, dict):
                 return parsed
         except json.JSONDecodeError:
@@ -516,75 +663,15 @@ def _parse_json_object(raw: str) -> dict[str, Any] | None:
     return None
 
 
-def _apply_aliases(payload: dict[str, Any]) -> None:
-    if "score_total" not in payload:
-        for alias in ("total_score", "score", "final_score", "overall_score", "scoreTotal"):
-            if alias in payload:
-                payload["score_total"] = payload[alias]
-                break
-
-    if "rubric_scores" not in payload:
-        for alias in ("rubric", "rubric_score", "rubricScores"):
-            if alias in payload:
-                payload["rubric_scores"] = payload[alias]
-                break
-
-    if "next_checklist" not in payload:
-        for alias in ("checklist", "next_steps", "nextChecklist", "review_checklist"):
-            if alias in payload:
-                payload["next_checklist"] = payload[alias]
-                break
-
-    if "answer_verdict" not in payload:
-        for alias in ("verdict", "is_correct", "correctness", "answerVerdict"):
-            if alias in payload:
-                payload["answer_verdict"] = payload[alias]
-                break
-
-    if "answer_verdict_reason" not in payload:
-        for alias in ("verdict_reason", "correctness_reason", "answerVerdictReason"):
-            if alias in payload:
-                payload["answer_verdict_reason"] = payload[alias]
-                break
-
-    rubric = payload.get("rubric_scores")
-    if isinstance(rubric, dict):
-        alias_map = {
-            "condition": "conditions",
-            "model": "modeling",
-            "cal": "calculation",
-        }
-        for source, target in alias_map.items():
-            if target not in rubric and source in rubric:
-                rubric[target] = rubric[source]
-        payload["rubric_scores"] = rubric
-
-
-def _normalize_numeric_fields(payload: dict[str, Any]) -> None:
-    score = _to_float(payload.get("score_total"))
-    if score is not None:
-        payload["score_total"] = score
-
-    rubric = payload.get("rubric_scores")
-    if isinstance(rubric, dict):
-        for key in ("conditions", "modeling", "logic", "calculation", "final"):
-            value = _to_float(rubric.get(key))
-            if value is not None:
-                rubric[key] = value
-        payload["rubric_scores"] = rubric
-
-    mistakes = payload.get("mistakes")
-    if isinstance(mistakes, list):
-        for item in mistakes:
-            if not isinstance(item, dict):
-                continue
-            points = _to_float(item.get("points_deducted"))
-            if points is not None:
-                item["points_deducted"] = points
-
-
-def _prune_to_schema_shape(payload: dict[str, Any]) -> None:
-    allowed_top = {
+_RESULT_KEY_ALIASES: dict[str, tuple[str, ...]] = {
+    "score_total": ("total_score", "score", "final_score", "overall_score", "scoreTotal"),
+    "rubric_scores": ("rubric", "rubric_score", "rubricScores"),
+    "next_checklist": ("checklist", "next_steps", "nextChecklist", "review_checklist"),
+    "answer_verdict": ("verdict", "is_correct", "correctness", "answerVerdict"),
+    "answer_verdict_reason": ("verdict_reason", "correctness_reason", "answerVerdictReason"),
+}
+_RESULT_TOP_KEYS = frozenset(
+    (
         "score_total",
         "rubric_scores",
         "mistakes",
@@ -594,62 +681,29 @@ def _prune_to_schema_shape(payload: dict[str, Any]) -> None:
         "missing_info",
         "answer_verdict",
         "answer_verdict_reason",
-    }
-    for key in list(payload.keys()):
-        if key not in allowed_top:
-            payload.pop(key, None)
+    )
+)
+_RUBRIC_KEY_ALIASES = (("condition", "conditions"), ("model", "modeling"), ("cal", "calculation"))
+
+
+def _apply_aliases_and_prune(payload: dict[str, Any]) -> None:
+    # Nested values (rubric, mistakes, patch) are rebuilt from known keys and
+    # coerced by _ensure_required_defaults, so only the top level is touched here.
+    for target, aliases in _RESULT_KEY_ALIASES.items():
+        if target not in payload:
+            for alias in aliases:
+                if alias in payload:
+                    payload[target] = payload[alias]
+                    break
 
     rubric = payload.get("rubric_scores")
     if isinstance(rubric, dict):
-        allowed_rubric = {"conditions", "modeling", "logic", "calculation", "final"}
-        for key in list(rubric.keys()):
-            if key not in allowed_rubric:
-                rubric.pop(key, None)
-        payload["rubric_scores"] = rubric
-
-    mistakes = payload.get("mistakes")
-    if isinstance(mistakes, list):
-        allowed_mistake = {
-            "type",
-            "severity",
-            "points_deducted",
-            "evidence",
-            "fix_instruction",
-            "location_hint",
-            "highlight",
-        }
-        allowed_highlight = {"mode", "shape", "x", "y", "w", "h"}
-        for item in mistakes:
-            if not isinstance(item, dict):
-                continue
-            for key in list(item.keys()):
-                if key not in allowed_mistake:
-                    item.pop(key, None)
-            highlight = item.get("highlight")
-            if isinstance(highlight, dict):
-                for key in list(highlight.keys()):
-                    if key not in allowed_highlight:
-                        highlight.pop(key, None)
-                item["highlight"] = highlight
-        payload["mistakes"] = mistakes
+        for source, target in _RUBRIC_KEY_ALIASES:
+            if target not in rubric and source in rubric:
+                rubric[target] = rubric[source]
 
-    patch = payload.get("patch")
-    if isinstance(patch, dict):
-        allowed_patch = {"minimal_changes", "patched_solution_brief"}
-        for key in list(patch.keys()):
-            if key not in allowed_patch:
-                patch.pop(key, None)
-        minimal_changes = patch.get("minimal_changes")
-        if isinstance(minimal_changes, list):
-            allowed_change = {"change", "rationale"}
-            for item in minimal_changes:
-                if not isinstance(item, dict):
-                    continue
-                for key in list(item.keys()):
-                    if key not in allowed_change:
-                        item.pop(key, None)
-            patch["minimal_changes"] = minimal_changes
-        payload["patch"] = patch
+    for key in payload.keys() - _RESULT_TOP_KEYS:
+        del payload[key]
 
 
 def _ensure_required_defaults(payload: dict[str, Any]) -> None:
@@ -784,22 +838,24 @@ def _ensure_required_defaults(payload: dict[str, Any]) -> None:
 
 
 def _normalize_mistake(item: dict[str, Any]) -> dict[str, Any]:
-    valid_types = {member.value for member in MistakeType}
-    valid_severity = {member.value for member in Severity}
+    mistake_type = str(item.get("type") or _LOGIC_GAP).strip().upper()
+    if mistake_type not in MISTAKE_TYPES_SET:
+        mistake_type = _LOGIC_GAP
 
-    mistake_type = str(item.get("type") or MistakeType.logic_gap.value).strip().upper()
-    if mistake_type not in valid_types:
-        mistake_type = MistakeType.logic_gap.value
-
-    severity = str(item.get("severity") or Severity.med.value).strip().lower()
-    if severity not in valid_severity:
-        severity = Severity.med.value
+    raw_severity = item.get("severity")
+    severity = _SEV_LOOKUP.get(raw_severity) if type(raw_severity) is str else None
+    if severity is None:
+        severity = str(raw_severity or _SEV_MED).strip().lower()
+        if severity not in _VALID_SEVERITIES:
+            severity = _SEV_MED
 
     points = _to_float(item.get("points_deducted"))
     if points is None:
         points = 0.5
-    points = _normalize_points_by_severity(points, severity)
-    points = round(_clamp(points, 0.0, 2.0), 2)
+    low, high = _SEVERITY_POINT_BANDS[severity]
+    if not low < points <= high:
+        points = _clamp(_normalize_points_by_severity(points, severity), 0.0, 2.0)
+    points = round(points, 2)
 
     highlight = item.get("highlight")
     if not isinstance(highlight, dict):
@@ -881,12 +937,7 @@ def _clean_text(value: Any, default: str, max_len: int) -> str:
 
 
 def _contains_math_expression(text: str) -> bool:
-    return bool(
-        re.search(
-            r"(?:\d+\s*/\s*\d+|[\^=√]|\\frac|\\sqrt|[a-zA-Z]\s*[=]|[(){}\[\]])",
-            text,
-        )
-    )
+    return bool(_MATH_EXPRESSION_PATTERN.search(text))
 
 
 def _trim_unbalanced_suffix(text: str) -> str:
@@ -911,7 +962,7 @@ def _trim_unbalanced_suffix(text: str) -> str:
     for open_bracket, close_bracket in (("(", ")"), ("[", "]"), ("{", "}")):
         while candidate.endswith(close_bracket) and candidate.count(open_bracket) < candidate.count(close_bracket):
             candidate = candidate[:-1].rstrip(" ,;:-")
-    candidate = re.sub(r"\^(\d+\s*/\s*\d+)\)", r"^(\1)", candidate)
+    candidate = _UNPARENTHESIZED_EXPONENT_PATTERN.sub(r"^(\1)", candidate)
     return candidate
 
 
@@ -923,11 +974,7 @@ def _compact_feedback_text(text: str, max_len: int) -> str:
     effective_max_len = max_len
     if has_math:
         effective_max_len = max(max_len, 96)
-    first_clause = re.split(
-        r"(?:[.!?]| 그리고 | 또한 | 따라서 | 그러므로 | 이후 | 및 | with )",
-        normalized,
-        maxsplit=1,
-    )[0].strip()
+    first_clause = _CLAUSE_BREAK_PATTERN.split(normalized, maxsplit=1)[0].strip()
     candidate = first_clause if len(first_clause) >= 8 else normalized
     if has_math and len(candidate) <= int(effective_max_len * 1.25):
         return _trim_unbalanced_suffix(candidate)
@@ -946,30 +993,29 @@ def _retarget_mistake_type(
     fix_instruction: str,
     location_hint: str,
 ) -> str:
-    valid_types = {member.value for member in MistakeType}
-    base_type = mistake_type if mistake_type in valid_types else MistakeType.logic_gap.value
+    base_type = mistake_type if mistake_type in MISTAKE_TYPES_SET else _LOGIC_GAP
     combined = " ".join([evidence, fix_instruction, location_hint]).lower()
 
     if any(token in combined for token in ("최종 답", "최종값", "대입", "검산")):
-        return MistakeType.final_form_error.value
+        return _FINAL_FORM_ERROR
     if any(token in combined for token in ("단위", "cm", "mm", "kg", "m/s", "km/h", "°c")):
-        return MistakeType.unit_error.value
+        return _UNIT_ERROR
     if any(token in combined for token in ("부호", "음수", "양수", "플러스", "마이너스")):
-        return MistakeType.sign_error.value
+        return _SIGN_ERROR
     if any(token in combined for token in ("케이스", "경우 나눔", "경우의 수")):
-        return MistakeType.case_miss.value
+        return _CASE_MISS
     if any(token in combined for token in ("그래프", "축", "기울기", "절편")):
-        return MistakeType.graph_misread.value
+        return _GRAPH_MISREAD
     if any(token in combined for token in ("정의", "성질", "공식", "정리", "법칙", "이론", "개념", "지수법칙", "근호")):
         if any(token in combined for token in ("조건 누락", "정의역", "범위", "제약", "가정", "누락")):
-            return MistakeType.condition_missed.value
-        return MistakeType.definition_confusion.value
+            return _CONDITION_MISSED
+        return _DEFINITION_CONFUSION
     if any(token in combined for token in ("전개", "약분", "동치", "식 변형", "분수지수", "거듭제곱")):
-        return MistakeType.algebra_error.value
+        return _ALGEBRA_ERROR
     if any(token in combined for token in ("계산", "산술", "곱셈", "나눗셈", "덧셈", "뺄셈")):
-        return MistakeType.arithmetic_error.value
+        return _ARITHMETIC_ERROR
     if any(token in combined for token in ("논리", "비약", "연결")):
-        return MistakeType.logic_gap.value
+        return _LOGIC_GAP
     return base_type
 
 
@@ -978,6 +1024,17 @@ def _clamp(value: float, min_value: float, max_value: float) -> float:
 
 
 def _to_float(value: Any) -> float | None:
+    # Exact-type checks first: almost every call sees a plain float, int or str.
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
+    if value_type is str:
+        try:
+            return float(value)  # float() already ignores surrounding whitespace.
+        except ValueError:
+            return None
     if isinstance(value, (int, float)) and not isinstance(value, bool):
         return float(value)
     if isinstance(value, str):
@@ -1056,8 +1113,12 @@ def _apply_simple_equation_consistency(
     if not Path(solution_image_path).exists():
         return
 
-    problem_text = extract_image_text(problem_image_path)
-    solution_text = extract_image_text(solution_image_path)
+    # Tesseract runs as a subprocess per image, so both extractions overlap.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        problem_future = executor.submit(extract_image_text, problem_image_path)
+        solution_future = executor.submit(extract_image_text, solution_image_path)
+        problem_text = problem_future.result()
+        solution_text = solution_future.result()
     expected = _solve_simple_x(problem_text)
     given = _extract_last_x_value(solution_text)
     if expected is None or given is None:
@@ -1084,9 +1145,9 @@ def _solve_simple_x(problem_text: str) -> float | None:
     text = problem_text.lower()
     text = text.replace("−", "-").replace("—", "-")
     text = text.replace(",", ".")
-    text = re.sub(r"\s+", "", text)
+    text = _WHITESPACE_PATTERN.sub("", text)
 
-    direct = re.search(r"([+-]?\d*(?:\.\d+)?)x([+-]\d+(?:\.\d+)?)?=([+-]?\d+(?:\.\d+)?)", text)
+    direct = _DIRECT_LINEAR_EQ_PATTERN.search(text)
     if direct:
         a = _parse_coefficient(direct.group(1))
         b = float(direct.group(2)) if direct.group(2) else 0.0
@@ -1095,7 +1156,7 @@ def _solve_simple_x(problem_text: str) -> float | None:
             return None
         return (c - b) / a
 
-    swapped = re.search(r"([+-]?\d+(?:\.\d+)?)=([+-]?\d*(?:\.\d+)?)x([+-]\d+(?:\.\d+)?)?", text)
+    swapped = _SWAPPED_LINEAR_EQ_PATTERN.search(text)
     if swapped:
         c = float(swapped.group(1))
         a = _parse_coefficient(swapped.group(2))
@@ -1104,7 +1165,7 @@ def _solve_simple_x(problem_text: str) -> float | None:
             return None
         return (c - b) / a
 
-    divided = re.search(r"x/([+-]?\d+(?:\.\d+)?)=([+-]?\d+(?:\.\d+)?)", text)
+    divided = _DIVIDED_LINEAR_EQ_PATTERN.search(text)
     if divided:
         divisor = float(divided.group(1))
         rhs = float(divided.group(2))
@@ -1124,103 +1185,57 @@ def _parse_coefficient(token: str) -> float:
 def _extract_last_x_value(solution_text: str) -> float | None:
     text = _normalize_ocr_symbol_text(solution_text).lower()
     text = text.replace(",", ".")
-    candidates = re.findall(r"x\s*=\s*([^\n\r;,\]]+)", text)
-    if not candidates:
-        return None
-
-    parsed_values: list[float] = []
-    for raw in candidates:
-        expr = _normalize_numeric_expression(raw)
-        if not expr:
-            continue
-        value = _safe_eval_numeric_expression(expr)
-        if value is not None and math.isfinite(value):
-            parsed_values.append(value)
-
-    if not parsed_values:
-        return None
-    return parsed_values[-1]
+    candidates = _X_ASSIGNMENT_PATTERN.findall(text)
+    return _last_finite_numeric_value(candidates)
 
 
 def _extract_last_rhs_numeric_value(solution_text: str) -> float | None:
     text = _normalize_ocr_symbol_text(solution_text).replace(",", ".")
-    candidates = re.findall(r"=\s*([^\n\r;,\]]+)", text)
-    if not candidates:
-        return None
+    candidates = _RHS_VALUE_PATTERN.findall(text)
+    return _last_finite_numeric_value(candidates)
 
-    parsed_values: list[float] = []
-    for raw in candidates:
+
+def _last_finite_numeric_value(candidates: list[str]) -> float | None:
+    # Only the last usable value matters, so evaluate from the end and stop there.
+    for raw in reversed(candidates):
         expr = _normalize_numeric_expression(raw)
         if not expr:
             continue
         value = _safe_eval_numeric_expression(expr)
         if value is not None and math.isfinite(value):
-            parsed_values.append(value)
-
-    if not parsed_values:
-        return None
-    return parsed_values[-1]
+            return value
+    return None
 
 
 def _normalize_numeric_expression(raw: str) -> str:
     candidate = _clean_text(raw, "", 80)
     if not candidate:
         return ""
-    candidate = _normalize_ocr_symbol_text(candidate)
-    candidate = _normalize_ocr_digit_text(candidate)
-    candidate = re.sub(r"(?<=\d)x(?=\d|\()", "*", candidate, flags=re.IGNORECASE)
-    candidate = re.sub(r"(?<=\))x(?=\d|\()", "*", candidate, flags=re.IGNORECASE)
+    if _NUMERIC_EXPR_CHARS.issuperset(candidate):
+        # Nothing below would change it and the pattern matches it whole.
+        return candidate
+    candidate = _normalize_ocr_math_text(candidate)
+    candidate = _DIGIT_TIMES_X_PATTERN.sub("*", candidate)
+    candidate = _PAREN_TIMES_X_PATTERN.sub("*", candidate)
     candidate = candidate.replace(",", ".")
-    candidate = re.sub(r"\s+", "", candidate)
+    candidate = _WHITESPACE_PATTERN.sub("", candidate)
     if "x" in candidate.lower():
         return ""
     # Keep only the leading numeric expression segment (drop OCR tail text).
-    match = re.match(r"^[\+\-\*/\(\)\.\d]+", candidate)
+    match = _NUMERIC_EXPR_PATTERN.match(candidate)
     if not match:
         return ""
     expr = match.group(0)
-    if not expr or not re.fullmatch(r"[\+\-\*/\(\)\.\d]+", expr):
+    if not expr or not _NUMERIC_EXPR_PATTERN.fullmatch(expr):
         return ""
     return expr
 
 
 def _safe_eval_numeric_expression(expr: str) -> float | None:
-    try:
-        parsed = ast.parse(expr, mode="eval")
-    except SyntaxError:
-        return None
-
-    def _eval(node: ast.AST) -> float | None:
-        if isinstance(node, ast.Constant) and isinstance(node.value, Number):
-            return float(node.value)
-        if isinstance(node, ast.UnaryOp):
-            operand = _eval(node.operand)
-            if operand is None:
-                return None
-            if isinstance(node.op, ast.UAdd):
-                return operand
-            if isinstance(node.op, ast.USub):
-                return -operand
-            return None
-        if isinstance(node, ast.BinOp):
-            left = _eval(node.left)
-            right = _eval(node.right)
-            if left is None or right is None:
-                return None
-            if isinstance(node.op, ast.Add):
-                return left + right
-            if isinstance(node.op, ast.Sub):
-                return left - right
-            if isinstance(node.op, ast.Mult):
-                return left * right
-            if isinstance(node.op, ast.Div):
-                if abs(right) <= 1e-9:
-                    return None
-                return left / right
-            return None
-        return None
-
-    return _eval(parsed.body)
+    if _SIGNED_DECIMAL_PATTERN.fullmatch(expr):
+        return float(expr)
+    value = _evaluate_arithmetic(expr, allow_variable=False)
+    return value.b if value is not None else None
 
 
 def _apply_correct_answer_adjustment(result: dict[str, Any], expected: float, given: float) -> None:
@@ -1230,8 +1245,8 @@ def _apply_correct_answer_adjustment(result: dict[str, Any], expected: float, gi
             if not isinstance(item, dict):
                 continue
             mtype = str(item.get("type") or "")
-            if mtype in {MistakeType.final_form_error.value, MistakeType.arithmetic_error.value}:
-                item["severity"] = Severity.low.value
+            if mtype in {_FINAL_FORM_ERROR, _ARITHMETIC_ERROR}:
+                item["severity"] = _SEV_LOW
                 points = _to_float(item.get("points_deducted")) or 0.2
                 item["points_deducted"] = round(_clamp(min(points, 0.2), 0.0, 2.0), 2)
                 item["evidence"] = _clean_text(
@@ -1244,8 +1259,11 @@ def _apply_correct_answer_adjustment(result: dict[str, Any], expected: float, gi
     rubric = result.get("rubric_scores")
     if isinstance(rubric, dict):
         rubric["final"] = 2.0
-        rubric["logic"] = max(_to_float(rubric.get("logic")) or 1.8, 1.8)
-        total = sum(_to_float(rubric.get(key)) or 0.0 for key in ("conditions", "modeling", "logic", "calculation", "final"))
+        logic = rubric["logic"] = max(_to_float(rubric.get("logic")) or 1.8, 1.8)
+        conditions, modeling, calculation = (
+            _to_float(rubric.get(key)) or 0.0 for key in ("conditions", "modeling", "calculation")
+        )
+        total = sum((conditions, modeling, logic, calculation, 2.0))
         target = max(total, 9.5 if not result.get("mistakes") else 8.8)
         result["score_total"] = round(_clamp(target, 0.0, 10.0), 2)
         result["rubric_scores"] = rubric
@@ -1271,7 +1289,7 @@ def _apply_wrong_answer_adjustment(result: dict[str, Any], expected: float, give
 
     final_error = None
     for item in mistakes:
-        if isinstance(item, dict) and item.get("type") == MistakeType.final_form_error.value:
+        if isinstance(item, dict) and item.get("type") == _FINAL_FORM_ERROR:
             final_error = item
             break
 
@@ -1290,8 +1308,8 @@ def _apply_wrong_answer_adjustment(result: dict[str, Any], expected: float, give
         mistakes.insert(
             0,
             {
-                "type": MistakeType.final_form_error.value,
-                "severity": Severity.high.value,
+                "type": _FINAL_FORM_ERROR,
+                "severity": _SEV_HIGH,
                 "points_deducted": 2.0,
                 "evidence": evidence,
                 "fix_instruction": fix_instruction,
@@ -1300,7 +1318,7 @@ def _apply_wrong_answer_adjustment(result: dict[str, Any], expected: float, give
             },
         )
     else:
-        final_error["severity"] = Severity.high.value
+        final_error["severity"] = _SEV_HIGH
         points = _to_float(final_error.get("points_deducted")) or 1.5
         final_error["points_deducted"] = round(_clamp(max(points, 1.5), 0.0, 2.0), 2)
         final_error["evidence"] = evidence
@@ -1317,11 +1335,14 @@ def _apply_wrong_answer_adjustment(result: dict[str, Any], expected: float, give
     rubric = result.get("rubric_scores")
     if not isinstance(rubric, dict):
         rubric = {}
-    rubric["final"] = min(_to_float(rubric.get("final")) or 0.4, 0.4)
-    rubric["logic"] = min(_to_float(rubric.get("logic")) or 1.0, 1.0)
-    for key in ("conditions", "modeling", "calculation"):
-        rubric[key] = _clamp(_to_float(rubric.get(key)) or 1.2, 0.0, 2.0)
-    raw_sum = sum(_to_float(rubric.get(key)) or 0.0 for key in ("conditions", "modeling", "logic", "calculation", "final"))
+    final = rubric["final"] = min(_to_float(rubric.get("final")) or 0.4, 0.4)
+    logic = rubric["logic"] = min(_to_float(rubric.get("logic")) or 1.0, 1.0)
+    conditions, modeling, calculation = (
+        _clamp(_to_float(rubric.get(key)) or 1.2, 0.0, 2.0) for key in ("conditions", "modeling", "calculation")
+    )
+    rubric.update(conditions=conditions, modeling=modeling, calculation=calculation)
+    # Every key was just normalised to a float, so sum them without another _to_float pass.
+    raw_sum = sum((conditions, modeling, logic, calculation, final))
     target = min(_to_float(result.get("score_total")) or raw_sum, raw_sum, 5.0)
     result["score_total"] = round(_clamp(target, 0.0, 10.0), 2)
     result["rubric_scores"] = rubric
@@ -1529,7 +1550,7 @@ def _equation_candidates_from_lines(lines: list[str]) -> list[str]:
         line = _clean_text(raw_line, "", 180)
         if not line:
             continue
-        for part in re.split(r"[;,]", line):
+        for part in _EQUATION_LIST_SEPARATOR_PATTERN.split(line):
             for segment in _split_equation_like_segments(part):
                 if not _contains_variable_token(segment):
                     continue
@@ -1543,52 +1564,34 @@ def _split_equation_like_segments(raw: str) -> list[str]:
     text = _clean_text(raw, "", 180)
     if not text:
         return []
-    chunks = re.split(r"(?<=\d)\s+(?=[xX×✕✖χΧⅹｘ]\s*[\+\-\=])", text)
+    chunks = _EQUATION_SEGMENT_BREAK_PATTERN.split(text)
     segments = [_clean_text(chunk, "", 180) for chunk in chunks]
     return [item for item in segments if item]
 
 
 def _contains_variable_token(text: str) -> bool:
-    return bool(re.search(r"[xX×✕✖χΧⅹｘ]", text))
+    return bool(_VARIABLE_TOKEN_PATTERN.search(text))
 
 
 def _normalize_ocr_symbol_text(text: str) -> str:
-    normalized = text
-    normalized = normalized.replace("−", "-").replace("—", "-").replace("–", "-")
-    normalized = normalized.replace("＝", "=")
-    normalized = normalized.replace("⇒", "=").replace("→", "=").replace("⟶", "=")
-    normalized = normalized.replace("÷", "/")
-    for token in ("×", "✕", "✖", "χ", "Χ", "ⅹ", "ｘ", "X"):
-        normalized = normalized.replace(token, "x")
-    return normalized
+    return text.translate(_OCR_SYMBOL_TABLE)
 
 
 def _normalize_ocr_digit_text(text: str) -> str:
-    return text.translate(
-        str.maketrans(
-            {
-                "O": "0",
-                "o": "0",
-                "I": "1",
-                "l": "1",
-                "|": "1",
-                "S": "5",
-                "B": "8",
-                "Z": "2",
-            }
-        )
-    )
+    return text.translate(_OCR_DIGIT_TABLE)
+
+
+def _normalize_ocr_math_text(text: str) -> str:
+    # Same as the symbol pass followed by the digit pass, in one scan.
+    return text.translate(_OCR_MATH_TABLE)
 
 
 def _normalize_equation_text(text: str) -> str:
-    normalized = _normalize_ocr_symbol_text(text)
-    normalized = _normalize_ocr_digit_text(normalized)
-    normalized = normalized.replace(",", ".")
-    normalized = re.sub(r"\s+", "", normalized)
+    normalized = text.translate(_OCR_EQUATION_TABLE)
     normalized = normalized.replace("=>", "=").replace("->", "=")
     if normalized.count("=") == 0 and normalized.count(">") == 1:
         normalized = normalized.replace(">", "=")
-    if not _ALLOWED_EQUATION_CHARS.match(normalized):
+    if not _ALLOWED_EQUATION_CHARS.issuperset(normalized):
         return ""
     if normalized.count("=") != 1:
         return ""
@@ -1598,6 +1601,8 @@ def _normalize_equation_text(text: str) -> str:
     return normalized
 
 
+# Steps and expected equations repeat the same strings; results are frozen and safe to share.
+@lru_cache(maxsize=1024)
 def _parse_linear_equation(equation_text: str) -> LinearEquation | None:
     if "=" not in equation_text:
         return None
@@ -1613,72 +1618,126 @@ def _parse_linear_equation(equation_text: str) -> LinearEquation | None:
     )
 
 
+@lru_cache(maxsize=1024)
 def _parse_linear_expression(expression_text: str) -> LinearExpression | None:
-    normalized = _normalize_ocr_symbol_text(expression_text)
-    normalized = _normalize_ocr_digit_text(normalized)
-    normalized = normalized.replace(",", ".")
-    normalized = re.sub(r"\s+", "", normalized)
-    normalized = re.sub(r"(\d)(x)", r"\1*x", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"(\))(\d|x)", r"\1*\2", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"(\d|\))\(", r"\1*(", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"x\(", "x*(", normalized, flags=re.IGNORECASE)
-    if not normalized or not _ALLOWED_EXPR_CHARS.match(normalized):
+    normalized = expression_text.translate(_OCR_EQUATION_TABLE)
+    normalized = _IMPLICIT_MUL_DIGIT_X_PATTERN.sub(r"\1*x", normalized)
+    normalized = _IMPLICIT_MUL_PAREN_PATTERN.sub(r"\1*\2", normalized)
+    normalized = _IMPLICIT_MUL_OPEN_PAREN_PATTERN.sub(r"\1*(", normalized)
+    normalized = _IMPLICIT_MUL_X_PAREN_PATTERN.sub("x*(", normalized)
+    if not normalized or not _ALLOWED_EXPR_CHARS.issuperset(normalized):
         return None
 
-    try:
-        parsed = ast.parse(normalized, mode="eval")
-    except SyntaxError:
-        return None
-
-    return _eval_linear_node(parsed.body)
-
+    return _evaluate_arithmetic(normalized, allow_variable=True)
+
+
+def _tokenize_arithmetic(text: str, allow_variable: bool) -> list[Any] | None:
+    # Accepts exactly the tokens Python would, so results match the old ast-based evaluator.
+    # Operands become (a, b) pairs for a*x + b.
+    tokens: list[Any] = []
+    for token in _ARITHMETIC_TOKEN_PATTERN.findall(text):
+        head = token[0]
+        if head in "+-*/()":
+            if len(token) > 1:
+                return None  # ** and // are not supported.
+            tokens.append(token)
+        elif head in "0123456789" or (head == "." and len(token) > 1):
+            if head == "0" and "." not in token and token.strip("0"):
+                return None  # "07" is a SyntaxError, not 7.
+            tokens.append((0.0, float(token)))
+        elif head in "xX" and allow_variable and len(token) == 1:
+            tokens.append((1.0, 0.0))
+        else:
+            return None
+    return tokens
 
-def _eval_linear_node(node: ast.AST) -> LinearExpression | None:
-    if isinstance(node, ast.Constant) and isinstance(node.value, Number):
-        return LinearExpression(a=0.0, b=float(node.value))
 
-    if isinstance(node, ast.Name) and node.id.lower() == "x":
-        return LinearExpression(a=1.0, b=0.0)
+def _evaluate_arithmetic(text: str, allow_variable: bool) -> LinearExpression | None:
+    """Evaluate ``+ - * / ( )`` over numbers (and ``x``) as a linear expression.
 
-    if isinstance(node, ast.UnaryOp):
-        operand = _eval_linear_node(node.operand)
-        if operand is None:
-            return None
-        if isinstance(node.op, ast.UAdd):
-            return operand
-        if isinstance(node.op, ast.USub):
-            return LinearExpression(a=-operand.a, b=-operand.b)
+    Recursive descent with Python's precedence; anything Python would reject,
+    or that is not linear in ``x``, yields None.
+    """
+    tokens = _tokenize_arithmetic(text, allow_variable)
+    if not tokens:
+        return None
+    tokens.append(None)  # End marker, so lookahead never runs off the list.
+    pos = 0
+
+    def expression() -> tuple[float, float] | None:
+        nonlocal pos
+        left = term()
+        while left is not None:
+            operator = tokens[pos]
+            if operator != "+" and operator != "-":
+                return left
+            pos += 1
+            right = term()
+            if right is None:
+                return None
+            if operator == "+":
+                left = (left[0] + right[0], left[1] + right[1])
+            else:
+                left = (left[0] - right[0], left[1] - right[1])
         return None
 
-    if isinstance(node, ast.BinOp):
-        left = _eval_linear_node(node.left)
-        right = _eval_linear_node(node.right)
-        if left is None or right is None:
-            return None
+    def term() -> tuple[float, float] | None:
+        nonlocal pos
+        left = factor()
+        while left is not None:
+            operator = tokens[pos]
+            if operator != "*" and operator != "/":
+                return left
+            pos += 1
+            right = factor()
+            if right is None:
+                return None
+            left = _multiply_linear(left, right) if operator == "*" else _divide_linear(left, right)
+        return None
 
-        if isinstance(node.op, ast.Add):
-            return LinearExpression(a=left.a + right.a, b=left.b + right.b)
-        if isinstance(node.op, ast.Sub):
-            return LinearExpression(a=left.a - right.a, b=left.b - right.b)
-        if isinstance(node.op, ast.Mult):
-            left_is_constant = abs(left.a) <= 1e-9
-            right_is_constant = abs(right.a) <= 1e-9
-            if left_is_constant and right_is_constant:
-                return LinearExpression(a=0.0, b=left.b * right.b)
-            if left_is_constant and not right_is_constant:
-                return LinearExpression(a=right.a * left.b, b=right.b * left.b)
-            if right_is_constant and not left_is_constant:
-                return LinearExpression(a=left.a * right.b, b=left.b * right.b)
-            return None
-        if isinstance(node.op, ast.Div):
-            if abs(right.a) > 1e-9 or abs(right.b) <= 1e-9:
+    def factor() -> tuple[float, float] | None:
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        if type(token) is tuple:
+            return token
+        if token == "-":
+            operand = factor()
+            return (-operand[0], -operand[1]) if operand is not None else None
+        if token == "+":
+            return factor()
+        if token == "(":
+            inner = expression()
+            if inner is None or tokens[pos] != ")":
                 return None
-            return LinearExpression(a=left.a / right.b, b=left.b / right.b)
+            pos += 1
+            return inner
         return None
 
+    result = expression()
+    if result is None or tokens[pos] is not None:
+        return None
+    return LinearExpression(a=result[0], b=result[1])
+
+
+def _multiply_linear(left: tuple[float, float], right: tuple[float, float]) -> tuple[float, float] | None:
+    left_is_constant = abs(left[0]) <= 1e-9
+    right_is_constant = abs(right[0]) <= 1e-9
+    if left_is_constant and right_is_constant:
+        return (0.0, left[1] * right[1])
+    if left_is_constant:
+        return (right[0] * left[1], right[1] * left[1])
+    if right_is_constant:
+        return (left[0] * right[1], left[1] * right[1])
     return None
 
 
+def _divide_linear(left: tuple[float, float], right: tuple[float, float]) -> tuple[float, float] | None:
+    if abs(right[0]) > 1e-9 or abs(right[1]) <= 1e-9:
+        return None
+    return (left[0] / right[1], left[1] / right[1])
+
+
 def _equations_equivalent(first: LinearEquation, second: LinearEquation) -> bool:
     f_type, f_value = _solve_linear_equation(first)
     s_type, s_value = _solve_linear_equation(second)
@@ -1752,25 +1811,25 @@ def _inject_verification_findings(result: dict[str, Any], report: VerificationRe
         if finding.rule in {"RULE_FINAL_SUBSTITUTION", "RULE_EQUIV_TRANSFORM"} and not finding.counterexample:
             continue
         if finding.rule == "RULE_FINAL_SUBSTITUTION":
-            mistake_type = MistakeType.final_form_error.value
-            severity = Severity.high.value
+            mistake_type = _FINAL_FORM_ERROR
+            severity = _SEV_HIGH
             points = 1.5
             fix = "최종 값을 원식에 대입해 성립 여부를 확인한 뒤 답을 수정하세요."
         else:
             mistake_type = _retarget_mistake_type(
-                mistake_type=MistakeType.logic_gap.value,
+                mistake_type=_LOGIC_GAP,
                 evidence=finding.reason or "",
                 fix_instruction=finding.counterexample or "",
                 location_hint=location_by_step.get(finding.step_id) or "",
             )
-            severity = Severity.med.value
-            points = 0.7 if mistake_type in {MistakeType.definition_confusion.value, MistakeType.algebra_error.value} else 0.5
+            severity = _SEV_MED
+            points = 0.7 if mistake_type in {_DEFINITION_CONFUSION, _ALGEBRA_ERROR} else 0.5
             fix_map = {
-                MistakeType.definition_confusion.value: "적용한 정의/법칙의 조건을 확인하고 해당 줄을 고치세요.",
-                MistakeType.algebra_error.value: "전개/약분 규칙을 기준으로 전후 식이 동치인지 다시 맞추세요.",
-                MistakeType.arithmetic_error.value: "해당 줄의 수치 계산을 다시 수행해 값 불일치를 제거하세요.",
-                MistakeType.sign_error.value: "이항/전개 부호를 다시 대조해 식 변형을 바로잡으세요.",
-                MistakeType.logic_gap.value: "전후 식의 해가 같아지는지 한 줄씩 다시 전개해 수정하세요.",
+                _DEFINITION_CONFUSION: "적용한 정의/법칙의 조건을 확인하고 해당 줄을 고치세요.",
+                _ALGEBRA_ERROR: "전개/약분 규칙을 기준으로 전후 식이 동치인지 다시 맞추세요.",
+                _ARITHMETIC_ERROR: "해당 줄의 수치 계산을 다시 수행해 값 불일치를 제거하세요.",
+                _SIGN_ERROR: "이항/전개 부호를 다시 대조해 식 변형을 바로잡으세요.",
+                _LOGIC_GAP: "전후 식의 해가 같아지는지 한 줄씩 다시 전개해 수정하세요.",
             }
             fix = fix_map.get(mistake_type, "전후 식의 해가 같아지는지 한 줄씩 다시 전개해 수정하세요.")
 
@@ -1828,7 +1887,7 @@ def _enforce_evidence_gate(result: dict[str, Any], report: VerificationReport) -
         if not has_reason:
             if has_verification_context:
                 mistake["points_deducted"] = 0.0
-                mistake["severity"] = Severity.low.value
+                mistake["severity"] = _SEV_LOW
                 reason_text = "근거 부족으로 자동 감점을 보류했습니다."
                 hold_note = _clean_text(f"mistake#{idx + 1}: evidence_gate_hold", "", 80)
             else:
@@ -1836,7 +1895,7 @@ def _enforce_evidence_gate(result: dict[str, Any], report: VerificationReport) -
                 existing_points = _to_float(mistake.get("points_deducted")) or 0.0
                 if existing_points <= 0:
                     mistake["points_deducted"] = 0.3
-                    mistake["severity"] = Severity.low.value
+                    mistake["severity"] = _SEV_LOW
                 reason_text = "OCR 검증 정보 부족: 모델 감점 근거를 보류 없이 반영"
                 hold_note = _clean_text(f"mistake#{idx + 1}: evidence_unverified_model", "", 80)
             if hold_note and hold_note not in missing_info:
@@ -1915,7 +1974,7 @@ def _dedupe_mistakes_by_step_rule(result: dict[str, Any]) -> None:
     deduped.sort(
         key=lambda item: (
             _to_float(item.get("points_deducted")) or 0.0,
-            _severity_rank(str(item.get("severity") or Severity.low.value)),
+            _severity_rank(str(item.get("severity") or _SEV_LOW)),
         ),
         reverse=True,
     )
@@ -1971,7 +2030,7 @@ def _apply_uncertainty_policy(
         if not isinstance(mistake, dict):
             continue
         mistake["points_deducted"] = 0.0
-        mistake["severity"] = Severity.low.value
+        mistake["severity"] = _SEV_LOW
         step_id, rule, body = _parse_provenance(mistake.get("evidence"))
         reason = _clean_text(
             f"{body or '근거 불충분'} -> 자동 감점 보류(검토 필요)",
@@ -2054,15 +2113,15 @@ def _apply_verified_wrong_final_cap(result: dict[str, Any], report: Verification
 
     final_mistake: dict[str, Any] | None = None
     for item in mistakes:
-        if isinstance(item, dict) and item.get("type") == MistakeType.final_form_error.value:
+        if isinstance(item, dict) and item.get("type") == _FINAL_FORM_ERROR:
             final_mistake = item
             break
 
     failure = final_failures[0]
     if final_mistake is None:
         final_mistake = {
-            "type": MistakeType.final_form_error.value,
-            "severity": Severity.high.value,
+            "type": _FINAL_FORM_ERROR,
+            "severity": _SEV_HIGH,
             "points_deducted": 1.8,
             "evidence": _format_provenance_evidence(
                 step_id=failure.step_id,
@@ -2076,7 +2135,7 @@ def _apply_verified_wrong_final_cap(result: dict[str, Any], report: Verification
         }
         mistakes.insert(0, final_mistake)
     else:
-        final_mistake["severity"] = Severity.high.value
+        final_mistake["severity"] = _SEV_HIGH
         final_mistake["points_deducted"] = max(
             _to_float(final_mistake.get("points_deducted")) or 0.0,
             1.8,
@@ -2387,8 +2446,8 @@ def _ensure_mistake_coverage(result: dict[str, Any], report: VerificationReport)
             step_id = _infer_step_id("풀이 중간 구간", report.steps) or "s1"
             mistakes.append(
                 {
-                    "type": MistakeType.logic_gap.value,
-                    "severity": Severity.low.value if target_deduction < 0.8 else Severity.med.value,
+                    "type": _LOGIC_GAP,
+                    "severity": _SEV_LOW if target_deduction < 0.8 else _SEV_MED,
                     "points_deducted": round(_clamp(target_deduction, 0.1, 2.0), 2),
                     "evidence": _format_provenance_evidence(
                         step_id=step_id,
@@ -2434,8 +2493,8 @@ def _ensure_mistake_coverage(result: dict[str, Any], report: VerificationReport)
             step_id = _infer_step_id("풀이 중간 구간", report.steps) or "s1"
             mistakes.append(
                 {
-                    "type": MistakeType.logic_gap.value,
-                    "severity": Severity.med.value if gap < 1.0 else Severity.high.value,
+                    "type": _LOGIC_GAP,
+                    "severity": _SEV_MED if gap < 1.0 else _SEV_HIGH,
                     "points_deducted": round(_clamp(gap, 0.1, 2.0), 2),
                     "evidence": _format_provenance_evidence(
                         step_id=step_id,
@@ -2463,7 +2522,7 @@ def _is_better_solution_suggestion(mistake: dict[str, Any]) -> bool:
         return True
     severity = _normalize_severity(mistake.get("severity"))
     points = _to_float(mistake.get("points_deducted")) or 0.0
-    return severity == Severity.low.value and points <= 0.6
+    return severity == _SEV_LOW and points <= 0.6
 
 
 def _apply_suggestion_penalty_policy(result: dict[str, Any]) -> None:
@@ -2488,7 +2547,7 @@ def _apply_suggestion_penalty_policy(result: dict[str, Any]) -> None:
         if abs(capped - points) > 1e-9:
             adjusted = True
         item["points_deducted"] = capped
-        item["severity"] = Severity.low.value
+        item["severity"] = _SEV_LOW
 
     if all(suggestion_flags):
         total = round(sum((_to_float(item.get("points_deducted")) or 0.0) for item in mistakes), 2)
@@ -2518,11 +2577,11 @@ def _build_rubric_gap_mistakes(
         return []
 
     dims = [
-        ("conditions", MistakeType.condition_missed.value, "RULE_RUBRIC_CONDITIONS", "조건 반영"),
-        ("modeling", MistakeType.definition_confusion.value, "RULE_RUBRIC_MODELING", "식 세우기"),
-        ("logic", MistakeType.logic_gap.value, "RULE_RUBRIC_LOGIC", "논리 전개"),
-        ("calculation", MistakeType.arithmetic_error.value, "RULE_RUBRIC_CALC", "계산"),
-        ("final", MistakeType.final_form_error.value, "RULE_RUBRIC_FINAL", "최종 답 검산"),
+        ("conditions", _CONDITION_MISSED, "RULE_RUBRIC_CONDITIONS", "조건 반영"),
+        ("modeling", _DEFINITION_CONFUSION, "RULE_RUBRIC_MODELING", "식 세우기"),
+        ("logic", _LOGIC_GAP, "RULE_RUBRIC_LOGIC", "논리 전개"),
+        ("calculation", _ARITHMETIC_ERROR, "RULE_RUBRIC_CALC", "계산"),
+        ("final", _FINAL_FORM_ERROR, "RULE_RUBRIC_FINAL", "최종 답 검산"),
     ]
     deficits: list[tuple[str, str, str, str, float]] = []
     for key, mtype, rule, label in dims:
@@ -2545,7 +2604,7 @@ def _build_rubric_gap_mistakes(
         step_id = _default_step_for_dimension(key, report.steps, idx)
         location_hint = _default_location_for_dimension(key)
         severity = (
-            Severity.high.value if points >= 1.2 else Severity.med.value if points >= 0.6 else Severity.low.value
+            _SEV_HIGH if points >= 1.2 else _SEV_MED if points >= 0.6 else _SEV_LOW
         )
         additions.append(
             {
@@ -2583,8 +2642,8 @@ def _normalize_deductions_to_target(
     while len(normalized) * 20 < target_units and len(normalized) < 20:
         normalized.append(
             {
-                "type": MistakeType.logic_gap.value,
-                "severity": Severity.high.value,
+                "type": _LOGIC_GAP,
+                "severity": _SEV_HIGH,
                 "points_deducted": 1.0,
                 "evidence": _format_provenance_evidence(
                     step_id="s0",
@@ -2651,7 +2710,7 @@ def _normalize_deductions_to_target(
             continue
         item["points_deducted"] = points
         inferred_severity = (
-            Severity.high.value if points >= 1.2 else Severity.med.value if points >= 0.6 else Severity.low.value
+            _SEV_HIGH if points >= 1.2 else _SEV_MED if points >= 0.6 else _SEV_LOW
         )
         item["severity"] = _higher_severity(item.get("severity"), inferred_severity)
         output.append(item)
@@ -2661,8 +2720,8 @@ def _normalize_deductions_to_target(
         fallback_points = _round_to_tenth(min(2.0, target_units / 10.0))
         output.append(
             {
-                "type": MistakeType.logic_gap.value,
-                "severity": Severity.high.value if fallback_points >= 1.2 else Severity.med.value,
+                "type": _LOGIC_GAP,
+                "severity": _SEV_HIGH if fallback_points >= 1.2 else _SEV_MED,
                 "points_deducted": fallback_points,
                 "evidence": _format_provenance_evidence(
                     step_id="s0",
@@ -2777,13 +2836,13 @@ def _infer_step_id(location_hint: Any, steps: list[ExtractedStep]) -> str | None
     if "세" in hint and len(steps) >= 3:
         return steps[2].step_id
 
-    hint_tokens = set(re.findall(r"[0-9a-zA-Z가-힣]+", hint))
+    hint_tokens = set(_WORD_TOKEN_PATTERN.findall(hint))
     if not hint_tokens:
         return steps[-1].step_id
 
     scored: list[tuple[float, str]] = []
     for step in steps:
-        step_tokens = set(re.findall(r"[0-9a-zA-Z가-힣]+", step.text.lower()))
+        step_tokens = set(_WORD_TOKEN_PATTERN.findall(step.text.lower()))
         if not step_tokens:
             continue
         overlap = len(hint_tokens.intersection(step_tokens))
@@ -2800,11 +2859,11 @@ def _infer_step_id(location_hint: Any, steps: list[ExtractedStep]) -> str | None
 def _default_rule_for_mistake_type(mtype: str) -> str:
     normalized = mtype.strip().upper()
     rule_map = {
-        MistakeType.final_form_error.value: "RULE_FINAL_SUBSTITUTION",
-        MistakeType.sign_error.value: "RULE_EQUIV_TRANSFORM",
-        MistakeType.arithmetic_error.value: "RULE_EQUIV_TRANSFORM",
-        MistakeType.algebra_error.value: "RULE_EQUIV_TRANSFORM",
-        MistakeType.logic_gap.value: "RULE_EQUIV_TRANSFORM",
+        _FINAL_FORM_ERROR: "RULE_FINAL_SUBSTITUTION",
+        _SIGN_ERROR: "RULE_EQUIV_TRANSFORM",
+        _ARITHMETIC_ERROR: "RULE_EQUIV_TRANSFORM",
+        _ALGEBRA_ERROR: "RULE_EQUIV_TRANSFORM",
+        _LOGIC_GAP: "RULE_EQUIV_TRANSFORM",
     }
     return rule_map.get(normalized, "RULE_GENERAL_CONSISTENCY")
 
@@ -2822,9 +2881,9 @@ def _normalize_severity(value: Any) -> str:
     text = str(value or "").strip().lower()
     if text.startswith("severity."):
         text = text.split(".", 1)[1]
-    if text in {Severity.low.value, Severity.med.value, Severity.high.value}:
+    if text in {_SEV_LOW, _SEV_MED, _SEV_HIGH}:
         return text
-    return Severity.low.value
+    return _SEV_LOW
 
 
 def _normalize_answer_verdict(value: Any) -> str:
@@ -2855,8 +2914,8 @@ def _higher_severity(existing: Any, current: Any) -> str:
 
 
 def _text_similarity(first: str, second: str) -> float:
-    first_tokens = set(re.findall(r"[0-9a-zA-Z가-힣]+", first.lower()))
-    second_tokens = set(re.findall(r"[0-9a-zA-Z가-힣]+", second.lower()))
+    first_tokens = set(_WORD_TOKEN_PATTERN.findall(first.lower()))
+    second_tokens = set(_WORD_TOKEN_PATTERN.findall(second.lower()))
     if not first_tokens and not second_tokens:
         return 1.0
     if not first_tokens or not second_tokens:
@@ -2866,8 +2925,8 @@ def _text_similarity(first: str, second: str) -> float:
 
 def _make_review_placeholder() -> dict[str, Any]:
     return {
-        "type": MistakeType.logic_gap.value,
-        "severity": Severity.low.value,
+        "type": _LOGIC_GAP,
+        "severity": _SEV_LOW,
         "points_deducted": 0.0,
         "evidence": _format_provenance_evidence(
             step_id="s0",
@@ -2884,7 +2943,7 @@ def _load_fallback_result() -> dict[str, Any]:
     path = settings.fallback_path
     if not path.exists():
         raise RuntimeError(f"Fallback file not found: {path}")
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = _json_loads(path.read_bytes())
     return _validate_result(payload)
 
 
@@ -2925,7 +2984,7 @@ def _inject_ocr_hints(result: dict[str, Any], image_path: str) -> None:
 def _step_id_to_hint_index(step_id: str | None, box_count: int) -> int | None:
     if not step_id or box_count <= 0:
         return None
-    match = re.match(r"^[sS](\d+)$", step_id.strip())
+    match = _STEP_ID_PATTERN.match(step_id.strip())
     if not match:
         return None
     step_number = int(match.group(1))
@@ -3035,9 +3094,9 @@ def _box_bounds(box: dict[str, Any]) -> tuple[float, float, float, float] | None
     return (x0, y0, x1, y1)
 
 def _normalize_points_by_severity(points: float, severity: str) -> float:
-    if severity == Severity.high.value:
+    if severity == _SEV_HIGH:
         return max(points, 1.0)
-    if severity == Severity.med.value:
+    if severity == _SEV_MED:
         return max(points, 0.4)
     # low
     return min(points, 0.6)
@@ -3081,7 +3140,7 @@ def _sort_mistakes(mistakes: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return sorted(
         mistakes,
         key=lambda item: (
-            _severity_rank(str(item.get("severity") or Severity.med.value)),
+            _severity_rank(str(item.get("severity") or _SEV_MED)),
             _to_float(item.get("points_deducted")) or 0.0,
         ),
         reverse=True,
@@ -3090,7 +3149,7 @@ def _sort_mistakes(mistakes: list[dict[str, Any]]) -> list[dict[str, Any]]:
 
 def _signature_text(value: Any) -> str:
     text = _clean_text(value, "", 120).lower()
-    text = re.sub(r"\d+", "#", text)
+    text = _DIGIT_RUN_PATTERN.sub("#", text)
     return text
 
 
@@ -3127,13 +3186,13 @@ def _normalize_fix_instruction(text: str, mistake_type: str, severity: str, poin
         concise = _compact_feedback_text(normalized, 120)
     else:
         template_map = {
-            MistakeType.sign_error.value: "이항과 전개 단계의 부호를 한 줄씩 다시 대조하세요.",
-            MistakeType.unit_error.value: "최종 줄과 중간 계산의 단위를 동일 기준으로 정리하세요.",
-            MistakeType.condition_missed.value: "문제 조건을 식 옆에 적고 누락 없이 반영하세요.",
-            MistakeType.algebra_error.value: "거듭제곱/약분 근거를 한 줄씩 명시해 계산하세요.",
-            MistakeType.definition_confusion.value: "사용한 정의/법칙의 적용 조건을 먼저 확인하고 식에 반영하세요.",
-            MistakeType.final_form_error.value: "최종 답을 원식에 다시 대입해 성립 여부를 확인하세요.",
-            MistakeType.logic_gap.value: "단계 간 연결 근거를 한 줄씩 보강하고 점프를 줄이세요.",
+            _SIGN_ERROR: "이항과 전개 단계의 부호를 한 줄씩 다시 대조하세요.",
+            _UNIT_ERROR: "최종 줄과 중간 계산의 단위를 동일 기준으로 정리하세요.",
+            _CONDITION_MISSED: "문제 조건을 식 옆에 적고 누락 없이 반영하세요.",
+            _ALGEBRA_ERROR: "거듭제곱/약분 근거를 한 줄씩 명시해 계산하세요.",
+            _DEFINITION_CONFUSION: "사용한 정의/법칙의 적용 조건을 먼저 확인하고 식에 반영하세요.",
+            _FINAL_FORM_ERROR: "최종 답을 원식에 다시 대입해 성립 여부를 확인하세요.",
+            _LOGIC_GAP: "단계 간 연결 근거를 한 줄씩 보강하고 점프를 줄이세요.",
         }
         concise = _compact_feedback_text(
             template_map.get(mistake_type, "핵심 감점 구간을 한 줄씩 다시 전개해 수정하세요."),
@@ -3141,10 +3200,10 @@ def _normalize_fix_instruction(text: str, mistake_type: str, severity: str, poin
         )
 
     suggestion_target = (
-        _normalize_severity(severity) == Severity.low.value
+        _normalize_severity(severity) == _SEV_LOW
         or points <= 0.6
         or (
-            mistake_type in {MistakeType.logic_gap.value, MistakeType.algebra_error.value}
+            mistake_type in {_LOGIC_GAP, _ALGEBRA_ERROR}
             and points <= 0.8
         )
     )
@@ -3161,10 +3220,10 @@ def _normalize_location_hint(text: str, mistake_type: str) -> str:
         return _compact_feedback_text(normalized, 30)
 
     template_map = {
-        MistakeType.final_form_error.value: "최종 답 줄",
-        MistakeType.unit_error.value: "단위 표기 줄",
-        MistakeType.sign_error.value: "이항/부호 처리 줄",
-        MistakeType.condition_missed.value: "초기 조건 정리 줄",
+        _FINAL_FORM_ERROR: "최종 답 줄",
+        _UNIT_ERROR: "단위 표기 줄",
+        _SIGN_ERROR: "이항/부호 처리 줄",
+        _CONDITION_MISSED: "초기 조건 정리 줄",
     }
     return _compact_feedback_text(template_map.get(mistake_type, "풀이 중간 구간"), 30)
 
@@ -3180,10 +3239,10 @@ def _normalize_evidence(text: str, mistake_type: str) -> str:
         return normalized
 
     template_map = {
-        MistakeType.final_form_error.value: "최종 답이 문제 조건 또는 식 검산 결과와 일치하지 않습니다.",
-        MistakeType.sign_error.value: "이항/전개 단계에서 부호 처리 불일치가 보입니다.",
-        MistakeType.unit_error.value: "중간 계산과 최종 답의 단위 표기가 일관되지 않습니다.",
-        MistakeType.algebra_error.value: "식 전개 또는 약분 과정의 계산 일관성이 부족합니다.",
+        _FINAL_FORM_ERROR: "최종 답이 문제 조건 또는 식 검산 결과와 일치하지 않습니다.",
+        _SIGN_ERROR: "이항/전개 단계에서 부호 처리 불일치가 보입니다.",
+        _UNIT_ERROR: "중간 계산과 최종 답의 단위 표기가 일관되지 않습니다.",
+        _ALGEBRA_ERROR: "식 전개 또는 약분 과정의 계산 일관성이 부족합니다.",
     }
     return template_map.get(mistake_type, "감점 근거가 명확하지 않아 보수적으로 해석했습니다.")
 
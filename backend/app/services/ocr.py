@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+from functools import lru_cache
 from typing import Any
 
 from PIL import Image
@@ -10,19 +12,30 @@ except Exception:  # pragma: no cover - optional dependency
     pytesseract = None
 
 
-def extract_image_text(image_path: str, max_chars: int = 1500) -> str:
+@lru_cache(maxsize=32)
+def _image_to_string(image_path: str, mtime_ns: int) -> str:
+    # One analysis asks for the same image's text several times (equation
+    # check, step extraction, guardrails); run tesseract once per file version.
+    # Failures raise and are therefore not cached.
+    with Image.open(image_path) as img:
+        return pytesseract.image_to_string(img)
+
+
+def _ocr_text(image_path: str) -> str | None:
+    if pytesseract is None:
+        return None
     try:
-        with Image.open(image_path) as img:
-            if pytesseract is None:
-                return ""
-            try:
-                text = pytesseract.image_to_string(img)
-                normalized = " ".join(text.split())
-                return normalized[:max_chars]
-            except Exception:
-                return ""
+        return _image_to_string(image_path, os.stat(image_path).st_mtime_ns)
     except Exception:
+        return None
+
+
+def extract_image_text(image_path: str, max_chars: int = 1500) -> str:
+    text = _ocr_text(image_path)
+    if text is None:
         return ""
+    normalized = " ".join(text.split())
+    return normalized[:max_chars]
 
 
 def extract_image_lines(
@@ -30,15 +43,8 @@ def extract_image_lines(
     max_lines: int = 12,
     max_chars_per_line: int = 120,
 ) -> list[str]:
-    try:
-        with Image.open(image_path) as img:
-            if pytesseract is None:
-                return []
-            try:
-                text = pytesseract.image_to_string(img)
-            except Exception:
-                return []
-    except Exception:
+    text = _ocr_text(image_path)
+    if text is None:
         return []
 
     lines: list[str] = []
@@ -15,8 +15,28 @@ except Exception as exc:  # pragma: no cover - optional dependency at runtime
     OpenAI = None  # type: ignore[assignment]
     _OPENAI_IMPORT_ERROR = exc
 
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
 from ..config import settings
-from ..schemas import ANALYSIS_RESULT_JSON_SCHEMA, SYSTEM_PROMPT
+from ..schemas import SYSTEM_PROMPT, get_analysis_schema
+
+# The system turn never changes; build it once instead of on every request.
+_RESPONSES_SYSTEM_MESSAGE: dict[str, Any] = {
+    "role": "system",
+    "content": [{"type": "input_text", "text": SYSTEM_PROMPT}],
+}
+_CHAT_SYSTEM_MESSAGE: dict[str, Any] = {"role": "system", "content": SYSTEM_PROMPT}
+_FENCED_JSON_PATTERN = re.compile(r"```(?:json)?\s*(\{[\s\S]*\})\s*```", flags=re.IGNORECASE)
+
+
+def _json_loads(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
 
 
 class OpenAIService:
@@ -99,7 +119,7 @@ class OpenAIService:
                     "format": {
                         "type": "json_schema",
                         "name": "analysis_result",
-                        "schema": ANALYSIS_RESULT_JSON_SCHEMA,
+                        "schema": get_analysis_schema(),
                         "strict": True,
                     }
                 },
@@ -115,7 +135,7 @@ class OpenAIService:
                         "type": "json_schema",
                         "json_schema": {
                             "name": "analysis_result",
-                            "schema": ANALYSIS_RESULT_JSON_SCHEMA,
+                            "schema": get_analysis_schema(),
                             "strict": True,
                         },
                     },
@@ -222,7 +242,7 @@ class OpenAIService:
             content.append(self._responses_image_content(problem_image_path))
 
         return [
-            {"role": "system", "content": [{"type": "input_text", "text": SYSTEM_PROMPT}]},
+            _RESPONSES_SYSTEM_MESSAGE,
             {"role": "user", "content": content},
         ]
 
@@ -242,7 +262,7 @@ class OpenAIService:
             content.append(self._chat_image_content(problem_image_path))
 
         return [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            _CHAT_SYSTEM_MESSAGE,
             {"role": "user", "content": content},
         ]
 
@@ -328,16 +348,16 @@ class OpenAIService:
             return None
 
         try:
-            parsed = json.loads(raw)
+            parsed = _json_loads(raw)
             return parsed if isinstance(parsed, dict) else None
         except json.JSONDecodeError:
             pass
 
-        fenced = re.search(r"```(?:json)?\s*(\{[\s\S]*\})\s*```", raw, flags=re.IGNORECASE)
+        fenced = _FENCED_JSON_PATTERN.search(raw)
         if fenced:
             block = fenced.group(1)
             try:
-                parsed = json.loads(block)
+                parsed = _json_loads(block)
                 return parsed if isinstance(parsed, dict) else None
             except json.JSONDecodeError:
                 pass
@@ -347,7 +367,7 @@ class OpenAIService:
         if start >= 0 and end > start:
             snippet = raw[start : end + 1]
             try:
-                parsed = json.loads(snippet)
+                parsed = _json_loads(snippet)
                 return parsed if isinstance(parsed, dict) else None
             except json.JSONDecodeError:
                 return None
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+TERMINAL_TTL_SECONDS = 60.0
+# Matches the SSE watchdog; a running job refreshes its entry on every transition.
+ACTIVE_TTL_SECONDS = 30.0
+_TERMINAL_STATUSES = frozenset({"done", "failed"})
+
+
+class ProgressCache:
+    """Latest status snapshot per analysis, written by jobs running in this process.
+
+    SSE streams consult it before falling back to SQLite. Every entry expires:
+    finished analyses after ``TERMINAL_TTL_SECONDS``, others ``ACTIVE_TTL_SECONDS``
+    after their last update, so a job whose worker died never pins memory. A
+    miss (expiry, restart, job on another worker) simply means the caller reads
+    the DB as before.
+    """
+
+    def __init__(
+        self,
+        terminal_ttl: float = TERMINAL_TTL_SECONDS,
+        active_ttl: float = ACTIVE_TTL_SECONDS,
+    ) -> None:
+        self._terminal_ttl = terminal_ttl
+        self._active_ttl = active_ttl
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._expires: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def store(self, analysis_id: str, status: str, updated_at: str) -> None:
+        now = time.monotonic()
+        ttl = self._terminal_ttl if status in _TERMINAL_STATUSES else self._active_ttl
+        with self._lock:
+            self._evict_expired(now)
+            self._entries[analysis_id] = {"status": status, "updated_at": updated_at}
+            self._expires[analysis_id] = now + ttl
+
+    def get(self, analysis_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is None:
+                return None
+            if self._expires[analysis_id] <= time.monotonic():
+                del self._entries[analysis_id]
+                del self._expires[analysis_id]
+                return None
+            return dict(entry)
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [key for key, deadline in self._expires.items() if deadline <= now]
+        for key in expired:
+            del self._entries[key]
+            del self._expires[key]
+
+
+progress_cache = ProgressCache()
@@ -1,27 +1,133 @@
 from __future__ import annotations
 
-from typing import Any, Literal
+import asyncio
+import json
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Literal
+
+from starlette.concurrency import run_in_threadpool
 
 from ..config import settings
 
 try:
     from redis import Redis
+    from redis.asyncio import Redis as AsyncRedis
     from rq import Queue
 except Exception:  # pragma: no cover - optional runtime path
     Redis = None  # type: ignore[assignment]
+    AsyncRedis = None  # type: ignore[assignment]
     Queue = None  # type: ignore[assignment]
 
 
+LOCAL_QUEUE_MAXSIZE = 64
+SUBSCRIBER_QUEUE_MAXSIZE = 8
+
+
+def progress_channel(analysis_id: str) -> str:
+    return f"mp:analysis:{analysis_id}"
+
+
+class LocalProgressSubscription:
+    """Per-stream mailbox for progress of one analysis.
+
+    Only the latest transitions matter, so when the mailbox is full the oldest
+    message is dropped instead of blocking the publisher.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_MAXSIZE)
+
+    def deliver(self, payload: dict[str, Any]) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, payload)
+        except RuntimeError:
+            # Subscriber loop already closed; the stream is gone.
+            pass
+
+    def _put(self, payload: dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+
+    async def next(self, timeout: float) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalJobPool:
+    """Bounded in-process fallback used when no Redis queue is available.
+
+    Jobs run on the threadpool, at most ``workers`` at a time; ``submit`` refuses
+    work once ``maxsize`` jobs are waiting instead of piling up unbounded.
+    """
+
+    def __init__(self, maxsize: int = LOCAL_QUEUE_MAXSIZE) -> None:
+        self._maxsize = maxsize
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self, handler: Callable[[dict[str, Any]], None], workers: int | None = None) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        count = max(1, workers or os.cpu_count() or 2)
+        self._workers = [asyncio.create_task(self._run(self._queue, handler)) for _ in range(count)]
+
+    async def stop(self) -> None:
+        workers, self._workers = self._workers, []
+        self._queue = None
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def submit(self, payload: dict[str, Any]) -> bool:
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    @staticmethod
+    async def _run(queue: asyncio.Queue[dict[str, Any]], handler: Callable[[dict[str, Any]], None]) -> None:
+        while True:
+            payload = await queue.get()
+            try:
+                await run_in_threadpool(handler, payload)
+            except Exception:
+                # The job records its own failure state; keep the worker alive.
+                pass
+            finally:
+                queue.task_done()
+
+
 class QueueManager:
     def __init__(self) -> None:
         self._queue = None
+        self._redis = None
+        self.local_jobs = LocalJobPool()
+        self._local_subscribers: dict[str, set[LocalProgressSubscription]] = {}
+        self._local_lock = threading.Lock()
+        self._watchers: dict[str, tuple[asyncio.Task[None], asyncio.Event]] = {}
         if settings.use_redis_queue and Redis is not None and Queue is not None:
             try:
                 redis_conn = Redis.from_url(settings.redis_url)
                 redis_conn.ping()
                 self._queue = Queue("mistakepatch", connection=redis_conn)
+                self._redis = redis_conn
             except Exception:
                 self._queue = None
+                self._redis = None
 
     @property
     def mode(self) -> Literal["redis", "background"]:
@@ -34,5 +140,79 @@ class QueueManager:
         self._queue.enqueue("app.workers.tasks.run_analysis_job", payload, job_id=job_id)
         return True
 
+    def publish_progress(self, analysis_id: str, payload: dict[str, Any]) -> None:
+        """Best-effort notification; SSE streams re-read the DB if a message is lost."""
+        if self._redis is not None:
+            try:
+                self._redis.publish(progress_channel(analysis_id), json.dumps(payload, ensure_ascii=False))
+            except Exception:
+                pass
+            return
+
+        self._deliver_local(analysis_id, payload)
+
+    def _deliver_local(self, analysis_id: str, payload: dict[str, Any]) -> None:
+        with self._local_lock:
+            subscribers = tuple(self._local_subscribers.get(analysis_id, ()))
+        for subscriber in subscribers:
+            subscriber.deliver(payload)
+
+    @asynccontextmanager
+    async def subscribe_progress(self, analysis_id: str) -> AsyncIterator[LocalProgressSubscription]:
+        """Register a stream for progress of ``analysis_id``.
+
+        Streams watching the same analysis share one Redis subscription, which
+        is opened by the first subscriber and closed when the last one leaves.
+        """
+        subscription = LocalProgressSubscription(asyncio.get_running_loop())
+        with self._local_lock:
+            self._local_subscribers.setdefault(analysis_id, set()).add(subscription)
+        try:
+            if self._redis is not None and AsyncRedis is not None:
+                watcher = self._watchers.get(analysis_id)
+                if watcher is None:
+                    ready = asyncio.Event()
+                    task = asyncio.create_task(self._watch_redis(analysis_id, ready))
+                    watcher = self._watchers[analysis_id] = (task, ready)
+                # Callers read the DB after subscribing, so wait until Redis is listening.
+                await watcher[1].wait()
+            yield subscription
+        finally:
+            with self._local_lock:
+                subscribers = self._local_subscribers.get(analysis_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                last = not subscribers
+                if last:
+                    self._local_subscribers.pop(analysis_id, None)
+            if last:
+                watcher = self._watchers.pop(analysis_id, None)
+                if watcher is not None:
+                    watcher[0].cancel()
+
+    async def _watch_redis(self, analysis_id: str, ready: asyncio.Event) -> None:
+        client = AsyncRedis.from_url(settings.redis_url)
+        pubsub = client.pubsub()
+        try:
+            try:
+                await pubsub.subscribe(progress_channel(analysis_id))
+            finally:
+                ready.set()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                except (TypeError, ValueError):
+                    continue
+                if isinstance(payload, dict):
+                    self._deliver_local(analysis_id, payload)
+        except Exception:
+            # Redis went away; streams fall back to their watchdog DB reads.
+            pass
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
 
 queue_manager = QueueManager()
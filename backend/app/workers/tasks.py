@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from typing import Any
 
+from app.db import ensure_paths
 from app.services.analyzer import process_analysis_job
 
+# API processes create these in their lifespan; RQ workers may start first.
+ensure_paths()
+
 
 def run_analysis_job(payload: dict[str, Any]) -> None:
     process_analysis_job(payload)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import dataclasses
 import sys
+import threading
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.models import MistakeType, Severity
+from app.services import analyzer
 from app.services.analyzer import (
     _apply_highlight_mode_policy,
     _apply_suggestion_penalty_policy,
@@ -29,7 +34,9 @@ from app.services.analyzer import (
     _compact_feedback_text,
     _normalize_equation_text,
     _parse_linear_equation,
+    _parse_linear_expression,
     _reconcile_score_from_deductions,
+    _safe_eval_numeric_expression,
 )
 
 
@@ -45,6 +52,15 @@ class AnalyzerGuardrailsTestCase(unittest.TestCase):
         self.assertTrue(_equations_equivalent(first, second))
         self.assertFalse(_equations_equivalent(first, third))
 
+    def test_linear_expression_parser_follows_python_syntax(self) -> None:
+        expression = _parse_linear_expression("-(2x-4)/2+3(x+1)")
+        assert expression is not None
+        self.assertEqual((expression.a, expression.b), (2.0, 5.0))
+        for text in ("x*x", "2**x", "07+x", "(x+1", "x2", "1/0"):
+            self.assertIsNone(_parse_linear_expression(text), text)
+        self.assertEqual(_safe_eval_numeric_expression("-(4+2)*3/4"), -4.5)
+        self.assertIsNone(_safe_eval_numeric_expression("3//2"))
+
     def test_evidence_gate_blocks_unproven_deduction(self) -> None:
         result = {
             "mistakes": [
@@ -767,6 +783,26 @@ class AnalyzerGuardrailsTestCase(unittest.TestCase):
         self.assertEqual(len(merged), 2)
         self.assertGreater(merged[0]["h"], 0.12)
 
+    def test_consensus_runs_cap_concurrent_model_calls(self) -> None:
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        class FakeService:
+            def analyze_solution(self, **_: object) -> dict[str, int]:
+                with lock:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(0.02)
+                with lock:
+                    state["active"] -= 1
+                return {"run": 1}
+
+        many_runs = dataclasses.replace(analyzer.settings, consensus_runs=10)
+        with mock.patch.object(analyzer, "settings", many_runs), mock.patch.object(analyzer, "OpenAIService", FakeService):
+            results = analyzer._get_llm_results("solution.png", None, "math", "tap")
+        self.assertEqual(len(results), 10)
+        self.assertLessEqual(state["peak"], analyzer.MAX_CONCURRENT_LLM_RUNS)
+
 
 if __name__ == "__main__":
     unittest.main()
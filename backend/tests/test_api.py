@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import base64
+import dataclasses
+import json
 import sys
 import time
 import unittest
 from typing import Any
+from unittest import mock
 from pathlib import Path
 
 from fastapi.testclient import TestClient
@@ -13,6 +16,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.main import create_app
 from app.db import get_connection
+from app.repositories import save_analysis_result
 
 
 PNG_1X1 = base64.b64decode(
@@ -36,6 +40,44 @@ class APITestCase(unittest.TestCase):
     def _headers(self, user_id: str | None = None) -> dict[str, str]:
         return {"X-User-Id": user_id or self.USER_A}
 
+    def test_user_id_fast_path_matches_pattern(self) -> None:
+        from app.api.routes import USER_ID_PATTERN, _is_valid_user_id
+
+        samples = [
+            "a",
+            "user_01",
+            "A.b-c_d",
+            "9lives",
+            "x" * 64,
+            "x" * 65,
+            "_leading",
+            ".leading",
+            "-leading",
+            "has space",
+            "tab\tid",
+            "trailing\n",
+            "한글",
+            "emoji😀",
+            "semi;colon",
+        ]
+        for sample in samples:
+            with self.subTest(sample=sample):
+                self.assertEqual(_is_valid_user_id(sample), bool(USER_ID_PATTERN.fullmatch(sample)))
+
+    def test_sendfile_only_uses_disk_backed_uploads(self) -> None:
+        import io
+        import tempfile
+
+        from app.api.routes import _disk_backed_file
+
+        with tempfile.SpooledTemporaryFile(max_size=16) as spool:
+            spool.write(b"small")
+            self.assertIsNone(_disk_backed_file(spool))
+            self.assertFalse(spool._rolled)
+            spool.write(b"x" * 32)
+            self.assertIsNotNone(_disk_backed_file(spool))
+        self.assertIsNone(_disk_backed_file(io.BytesIO(b"data")))
+
     def test_analyze_requires_solution_image(self) -> None:
         with self._client() as client:
             response = client.post(
@@ -65,6 +107,62 @@ class APITestCase(unittest.TestCase):
             self.assertEqual(response.status_code, 400)
             self.assertIn("Invalid meta", response.json()["detail"])
 
+    def test_analyze_rejects_oversized_upload(self) -> None:
+        from app.api import routes
+
+        limited = dataclasses.replace(routes.settings, max_upload_bytes=len(PNG_1X1) - 1)
+        uploads_before = set(Path(limited.storage_path).iterdir())
+        with self._client() as client, mock.patch.object(routes, "settings", limited):
+            payload = self._multipart()
+            response = client.post(
+                "/api/v1/analyze",
+                files=payload["files"],
+                data=payload["data"],
+                headers=self._headers(),
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("too large", response.json()["detail"])
+        self.assertEqual(set(Path(limited.storage_path).iterdir()), uploads_before)
+
+    def test_failed_upload_copy_leaves_no_partial_file(self) -> None:
+        import asyncio
+        import io
+
+        from starlette.datastructures import Headers, UploadFile
+
+        from app.api import routes
+
+        class FailingUpload(UploadFile):
+            async def read(self, size: int = -1) -> bytes:
+                raise OSError("client went away")
+
+        upload = FailingUpload(
+            io.BytesIO(PNG_1X1), filename="s.png", headers=Headers({"content-type": "image/png"})
+        )
+        uploads_before = set(Path(routes.settings.storage_path).iterdir())
+        with self.assertRaises(OSError):
+            asyncio.run(routes._save_upload(upload))
+        self.assertEqual(set(Path(routes.settings.storage_path).iterdir()), uploads_before)
+
+    def test_analyze_returns_503_when_local_queue_is_full(self) -> None:
+        from app.services.queue_manager import queue_manager
+
+        with self._client() as client, mock.patch.object(queue_manager.local_jobs, "submit", return_value=False):
+            payload = self._multipart()
+            response = client.post(
+                "/api/v1/analyze",
+                files=payload["files"],
+                data=payload["data"],
+                headers=self._headers(),
+            )
+            self.assertEqual(response.status_code, 503)
+
+            with get_connection() as conn:
+                row = conn.execute(
+                    "SELECT status, error_code FROM analyses ORDER BY created_at DESC LIMIT 1"
+                ).fetchone()
+            self.assertEqual(row, ("failed", "queue_full"))
+
     def test_analyze_transitions_to_done_and_supports_annotations(self) -> None:
         with self._client() as client:
             payload = self._multipart()
@@ -88,6 +186,15 @@ class APITestCase(unittest.TestCase):
 
             self.assertTrue(detail)
             self.assertEqual(detail.get("status"), "done")
+            self.assertRegex(detail["solution_image_url"], r"^/uploads/[0-9a-f]{32}\.png$")
+            image_resp = client.get(detail["solution_image_url"])
+            self.assertEqual(image_resp.status_code, 200)
+            self.assertEqual(image_resp.content, PNG_1X1)
+            self.assertIn("immutable", image_resp.headers["cache-control"])
+            cached_resp = client.get(
+                detail["solution_image_url"], headers={"If-None-Match": image_resp.headers["etag"]}
+            )
+            self.assertEqual(cached_resp.status_code, 304)
             result = detail.get("result")
             self.assertIsNotNone(result)
             assert result is not None
@@ -113,6 +220,99 @@ class APITestCase(unittest.TestCase):
             self.assertEqual(ann_resp.status_code, 200)
             self.assertEqual(ann_resp.json()["analysis_id"], analysis_id)
 
+    def test_resaving_result_drops_annotations_on_replaced_mistakes(self) -> None:
+        with self._client() as client:
+            payload = self._multipart()
+            response = client.post(
+                "/api/v1/analyze",
+                files=payload["files"],
+                data=payload["data"],
+                headers=self._headers(),
+            )
+            self.assertEqual(response.status_code, 200)
+            analysis_id = response.json()["analysis_id"]
+
+            detail: dict[str, Any] = {}
+            for _ in range(10):
+                detail = client.get(f"/api/v1/analysis/{analysis_id}", headers=self._headers()).json()
+                if detail["status"] in {"done", "failed"}:
+                    break
+                time.sleep(0.2)
+            self.assertEqual(detail.get("status"), "done")
+            result = detail["result"]
+            old_mistake_id = result["mistakes"][0].pop("mistake_id")
+
+            ann_resp = client.post(
+                "/api/v1/annotations",
+                json={
+                    "analysis_id": analysis_id,
+                    "mistake_id": old_mistake_id,
+                    "mode": "region_box",
+                    "shape": "box",
+                    "x": 0.9,
+                    "y": 0.9,
+                    "w": 0.05,
+                    "h": 0.05,
+                },
+                headers=self._headers(),
+            )
+            self.assertEqual(ann_resp.status_code, 200)
+
+            for mistake in result["mistakes"]:
+                mistake.pop("mistake_id", None)
+            result["mistakes"][0]["evidence"] = "다른 실수 내용"
+            save_analysis_result(analysis_id, result)
+
+            with get_connection() as conn:
+                stale = conn.execute(
+                    "SELECT COUNT(*) FROM annotations WHERE analysis_id = ?", (analysis_id,)
+                ).fetchone()[0]
+            self.assertEqual(stale, 0)
+            resaved = client.get(f"/api/v1/analysis/{analysis_id}", headers=self._headers()).json()
+            first = resaved["result"]["mistakes"][0]
+            self.assertNotEqual(first["mistake_id"], old_mistake_id)
+            self.assertNotEqual(first["highlight"].get("mode"), "region_box")
+
+    def test_mistake_ids_follow_order_idx_not_insertion_order(self) -> None:
+        with self._client() as client:
+            payload = self._multipart()
+            response = client.post(
+                "/api/v1/analyze",
+                files=payload["files"],
+                data=payload["data"],
+                headers=self._headers(),
+            )
+            self.assertEqual(response.status_code, 200)
+            analysis_id = response.json()["analysis_id"]
+
+            detail: dict[str, Any] = {}
+            for _ in range(10):
+                detail = client.get(f"/api/v1/analysis/{analysis_id}", headers=self._headers()).json()
+                if detail["status"] in {"done", "failed"}:
+                    break
+                time.sleep(0.2)
+            self.assertEqual(detail.get("status"), "done")
+            result = detail["result"]
+            template = result["mistakes"][0]
+            template.pop("mistake_id", None)
+            result["mistakes"] = [{**template, "evidence": f"실수 {idx}"} for idx in range(3)]
+            save_analysis_result(analysis_id, result)
+
+            with get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT * FROM mistakes WHERE analysis_id = ? ORDER BY order_idx", (analysis_id,)
+                ).fetchall()
+                conn.execute("DELETE FROM mistakes WHERE analysis_id = ?", (analysis_id,))
+                for row in reversed(rows):
+                    conn.execute(f"INSERT INTO mistakes VALUES ({', '.join('?' * len(row))})", tuple(row))
+                conn.commit()
+            expected_ids = [row[0] for row in rows]
+
+            reloaded = client.get(f"/api/v1/analysis/{analysis_id}", headers=self._headers()).json()
+            mistakes = reloaded["result"]["mistakes"]
+            self.assertEqual([item["mistake_id"] for item in mistakes], expected_ids)
+            self.assertEqual([item["evidence"] for item in mistakes], ["실수 0", "실수 1", "실수 2"])
+
     def test_analysis_detail_survives_corrupt_result_json(self) -> None:
         with self._client() as client:
             payload = self._multipart()
@@ -146,6 +346,38 @@ class APITestCase(unittest.TestCase):
             self.assertIsNone(body["result"])
             self.assertIn("CORRUPT_RESULT_JSON", body["error_code"] or "")
 
+    def test_analysis_events_stream_reports_completion(self) -> None:
+        with self._client() as client:
+            payload = self._multipart()
+            response = client.post(
+                "/api/v1/analyze",
+                files=payload["files"],
+                data=payload["data"],
+                headers=self._headers(),
+            )
+            self.assertEqual(response.status_code, 200)
+            analysis_id = response.json()["analysis_id"]
+
+            events: list[dict[str, Any]] = []
+            with client.stream(
+                "GET",
+                f"/api/v1/analysis/{analysis_id}/events",
+                params={"user_id": self.USER_A},
+            ) as stream:
+                self.assertEqual(stream.status_code, 200)
+                self.assertTrue(stream.headers["content-type"].startswith("text/event-stream"))
+                for line in stream.iter_lines():
+                    if line.startswith("data: "):
+                        events.append(json.loads(line[len("data: ") :]))
+
+            self.assertGreaterEqual(len(events), 1)
+            last = events[-1]
+            self.assertEqual(last["analysis_id"], analysis_id)
+            self.assertEqual(last["status"], "done")
+            self.assertEqual(last["progress_step"], "completed")
+            self.assertEqual(last["progress_percent"], 100)
+            self.assertEqual(last["progress_message"], "분석 완료")
+
     def test_history_lists_recent_items(self) -> None:
         with self._client() as client:
             payload = self._multipart(meta='{"subject":"physics","highlight_mode":"tap"}')
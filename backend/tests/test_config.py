@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.config import _clamp01, _parse_dotenv
+
+ENV_EXAMPLE = Path(__file__).resolve().parents[1] / ".env.example"
+
+
+class DotenvParserTestCase(unittest.TestCase):
+    def test_env_example_empty_values_stay_on_their_line(self) -> None:
+        values = _parse_dotenv(ENV_EXAMPLE.read_text(encoding="utf-8"))
+        self.assertEqual(values["OPENAI_API_KEY"], "")
+        self.assertEqual(values["OPENAI_ORGANIZATION"], "")
+        self.assertEqual(values["OPENAI_PROJECT"], "")
+        self.assertEqual(values["OPENAI_MODEL"], "gpt-4o-mini")
+        self.assertEqual(values["GROQ_API_KEY"], "")
+        self.assertEqual(values["GROQ_MODEL"], "llama-3.1-8b-instant")
+
+    def test_empty_value_followed_by_another_line(self) -> None:
+        values = _parse_dotenv('A=\r\n  B = "two" \n\nC=\n# D=4\nE=five\n')
+        self.assertEqual(values, {"A": "", "B": "two", "C": "", "E": "five"})
+
+
+class ClampTestCase(unittest.TestCase):
+    def test_clamp01_bounds_and_nan(self) -> None:
+        self.assertEqual(_clamp01(-0.5), 0.0)
+        self.assertEqual(_clamp01(0.55), 0.55)
+        self.assertEqual(_clamp01(2.0), 1.0)
+        self.assertEqual(_clamp01(float("nan")), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
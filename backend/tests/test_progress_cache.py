@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services import progress_cache as progress_cache_module
+from app.services.progress_cache import ProgressCache
+
+
+class ProgressCacheTestCase(unittest.TestCase):
+    def test_stalled_active_entries_expire_and_refresh_on_store(self) -> None:
+        cache = ProgressCache(terminal_ttl=60.0, active_ttl=30.0)
+        with mock.patch.object(progress_cache_module.time, "monotonic", return_value=100.0):
+            cache.store("a1", "processing", "t1")
+            cache.store("a2", "processing", "t1")
+        with mock.patch.object(progress_cache_module.time, "monotonic", return_value=120.0):
+            cache.store("a1", "processing", "t2")
+        with mock.patch.object(progress_cache_module.time, "monotonic", return_value=140.0):
+            self.assertEqual(cache.get("a1"), {"status": "processing", "updated_at": "t2"})
+            self.assertIsNone(cache.get("a2"))
+            cache.store("a3", "done", "t3")
+        self.assertNotIn("a2", cache._entries)
+
+    def test_store_evicts_abandoned_entries(self) -> None:
+        cache = ProgressCache(terminal_ttl=60.0, active_ttl=30.0)
+        with mock.patch.object(progress_cache_module.time, "monotonic", return_value=0.0):
+            for index in range(100):
+                cache.store(f"dead{index}", "processing", "t0")
+        with mock.patch.object(progress_cache_module.time, "monotonic", return_value=31.0):
+            cache.store("live", "queued", "t1")
+        self.assertEqual(set(cache._entries), {"live"})
+        self.assertEqual(set(cache._expires), {"live"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import schemas
+from app.models import AnalysisResult, MistakeType
+
+_PARITY_KEYWORDS = ("enum", "minimum", "maximum", "maxLength", "maxItems")
+# Guardrails append notes to these lists after validation, so the model leaves
+# their items uncapped on purpose.
+_MODEL_UNCAPPED_ITEMS = {"$.next_checklist[]", "$.missing_info[]"}
+
+
+def _resolve(node: dict, root: dict) -> dict:
+    ref = node.get("$ref")
+    if ref is None:
+        return node
+    return _resolve(root["$defs"][ref.rsplit("/", 1)[-1]], root)
+
+
+class AnalysisSchemaTests(unittest.TestCase):
+    def test_schema_file_enum_matches_mistake_types(self) -> None:
+        schema = schemas.get_analysis_schema()
+        mistake_type = schema["$defs"]["Mistake"]["properties"]["type"]
+        self.assertEqual(mistake_type["enum"], [item.value for item in MistakeType])
+
+    def test_lazy_attributes_share_cached_objects(self) -> None:
+        self.assertIs(schemas.ANALYSIS_RESULT_JSON_SCHEMA, schemas.get_analysis_schema())
+        self.assertIs(schemas.ANALYSIS_RESULT_VALIDATOR, schemas.get_analysis_validator())
+        with self.assertRaises(AttributeError):
+            schemas.NOT_A_SCHEMA  # noqa: B018
+
+    def test_get_validator_reuses_validator_per_schema_object(self) -> None:
+        schema = {"type": "object", "required": ["a"]}
+        validator = schemas.get_validator(schema)
+        self.assertIs(schemas.get_validator(schema), validator)
+        self.assertIsNot(schemas.get_validator(dict(schema)), validator)
+        self.assertFalse(validator.is_valid({}))
+
+    def test_rubric_fast_path_matches_schema(self) -> None:
+        rubric = schemas.get_analysis_schema()["$defs"]["RubricScores"]
+        self.assertEqual(set(rubric["required"]), schemas.RUBRIC_KEYS)
+        for field in rubric["properties"].values():
+            self.assertEqual((field["minimum"], field["maximum"]), (0, schemas.RUBRIC_SCORE_MAX))
+
+        valid = dict.fromkeys(schemas.RUBRIC_KEYS, 1.5)
+        self.assertTrue(schemas._rubric_scores_valid(valid))
+        self.assertFalse(schemas._rubric_scores_valid({**valid, "final": 2.5}))
+        self.assertFalse(schemas._rubric_scores_valid({**valid, "final": True}))
+        self.assertFalse(schemas._rubric_scores_valid({**valid, "extra": 1}))
+
+    def test_closed_objects_still_report_unexpected_keys(self) -> None:
+        validator = schemas.get_validator(
+            {"type": "object", "properties": {"a": {}}, "additionalProperties": False}
+        )
+        self.assertTrue(validator.is_valid({"a": 1}))
+        errors = list(validator.iter_errors({"a": 1, "b": 2}))
+        self.assertEqual(len(errors), 1)
+        self.assertIn("'b' was unexpected", errors[0].message)
+
+    def test_schema_file_matches_pydantic_model_constraints(self) -> None:
+        wire = schemas.get_analysis_schema()
+        model = AnalysisResult.model_json_schema()
+
+        def compare(wire_node: dict, model_node: dict, path: str) -> None:
+            wire_node = _resolve(wire_node, wire)
+            model_node = _resolve(model_node, model)
+            for keyword in _PARITY_KEYWORDS:
+                if keyword in wire_node and not (keyword == "maxLength" and path in _MODEL_UNCAPPED_ITEMS):
+                    self.assertEqual(model_node.get(keyword), wire_node[keyword], f"{path}.{keyword}")
+            if "properties" in wire_node:
+                model_props = model_node["properties"]
+                self.assertEqual(set(wire_node["properties"]), set(model_props) - {"mistake_id"}, path)
+                for name, child in wire_node["properties"].items():
+                    compare(child, model_props[name], f"{path}.{name}")
+            if "items" in wire_node:
+                compare(wire_node["items"], model_node["items"], f"{path}[]")
+
+        compare(wire, model, "$")
+
+
+if __name__ == "__main__":
+    unittest.main()